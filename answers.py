@@ -0,0 +1,130 @@
+# Checking a typed conjugation against the expected form.
+#
+# A form is split into its letters and the harakat written on each letter.
+# An answer is EXACT when both match, SKELETON when only the letters match
+# (alef/hamza variants folded, as in the verb search), and while the learner
+# is still typing it is TYPING as long as it is a prefix of the expected
+# skeleton. An expected form is split the first time it is asked and kept
+# in a small LRU (VerbTable.form_key), so every keystroke after the first
+# only splits the typed text, and the deck never holds a key per form.
+import random
+import threading
+from array import array
+from collections import defaultdict
+
+from search import ARABIC_MARKS, LETTER_FOLDS
+
+TATWEEL = "\u0640"
+
+EMPTY = "empty"
+TYPING = "typing"
+WRONG = "wrong"
+SKELETON = "skeleton"
+EXACT = "exact"
+
+class AnswerKey:
+    __slots__ = ("letters", "marks", "skeleton")
+
+    def __init__(self, form):
+        letters = []
+        marks = []
+        for char in form:
+            # Characters the skeleton folds away ("-") are dropped here too, so
+            # letters, marks and skeleton always line up
+            if char == TATWEEL or char.isspace() or not char.translate(LETTER_FOLDS):
+                continue
+            if ARABIC_MARKS.match(char):
+                # Harakat belong to the letter before them; a stray leading mark is dropped
+                if marks:
+                    marks[-1] += char
+                continue
+            letters.append(char)
+            marks.append("")
+        self.letters = "".join(letters)
+        # Shadda + fatha and fatha + shadda are the same spelling
+        self.marks = tuple("".join(sorted(letter_marks)) for letter_marks in marks)
+        self.skeleton = self.letters.translate(LETTER_FOLDS)
+
+def check(expected, typed):
+    # (status, position): position is the first letter that differs, or None
+    answer = AnswerKey(typed)
+    if not answer.letters:
+        return EMPTY, None
+    if answer.skeleton == expected.skeleton:
+        for position, (letter, marks) in enumerate(zip(answer.letters, answer.marks)):
+            if letter != expected.letters[position] or marks != expected.marks[position]:
+                return SKELETON, position
+        return EXACT, None
+    if expected.skeleton.startswith(answer.skeleton):
+        return TYPING, None
+    for position, letter in enumerate(answer.skeleton):
+        if position >= len(expected.skeleton) or letter != expected.skeleton[position]:
+            return WRONG, position
+    return WRONG, len(answer.skeleton)
+
+# Verbs that make believable wrong options: infinitives with the same length
+# and harakat that differ in one letter, found through buckets keyed by the
+# infinitive with that letter replaced by a wildcard. Verbs two letters
+# away are reached through their neighbours, and when those run out any verb
+# with the same harakat (the same pattern) will do. A lookup only touches a
+# few buckets however large the deck is.
+WILDCARD = "?"
+
+def wildcard_keys(key):
+    cells = [letter + marks for letter, marks in zip(key.letters, key.marks)]
+    return ["".join(cells[:position]) + WILDCARD + key.marks[position] + "".join(cells[position + 1:])
+            for position in range(len(cells))]
+
+def pattern_key(key):
+    return "".join(WILDCARD + marks for marks in key.marks)
+
+class DistractorIndex:
+    def __init__(self):
+        self.infinitives = []
+        self.buckets = {}
+        self.ready = threading.Event()
+
+    def build(self, infinitives):
+        buckets = defaultdict(list)
+        for verb_index, infinitive in enumerate(infinitives):
+            self.infinitives.append(infinitive)
+            answer_key = AnswerKey(infinitive)
+            for key in wildcard_keys(answer_key) + [pattern_key(answer_key)]:
+                buckets[key].append(verb_index)
+        self.buckets = {key: array('I', bucket) for key, bucket in buckets.items()}
+        self.ready.set()
+        return self
+
+    def build_in_background(self, infinitives):
+        thread = threading.Thread(target=self.build, args=(infinitives,), name="distractor-index", daemon=True)
+        thread.start()
+        return thread
+
+    def neighbors(self, verb_index, limit, rng=random):
+        # Up to limit similar verbs, one-letter differences first
+        found = []
+        seen = {verb_index}
+        
+        def take(key):
+            # Start at a random place so the same verb does not always get the same options
+            bucket = self.buckets[key]
+            start = rng.randrange(len(bucket))
+            taken = []
+            for offset in range(min(len(bucket), 4 * limit)):
+                candidate = bucket[(start + offset) % len(bucket)]
+                if candidate not in seen and len(found) < limit:
+                    seen.add(candidate)
+                    found.append(candidate)
+                    taken.append(candidate)
+            return taken
+        
+        frontier = [verb_index]
+        while frontier and len(found) < limit:
+            next_frontier = []
+            for current in frontier:
+                for key in wildcard_keys(AnswerKey(self.infinitives[current])):
+                    next_frontier.extend(take(key))
+            frontier = next_frontier
+        if len(found) < limit:
+            take(pattern_key(AnswerKey(self.infinitives[verb_index])))
+        return found
@@ -3,14 +3,32 @@ import sys
 import random
 import os
 import json
+import bisect
+import mmap
+import struct
+import time
+import csv
+import hashlib
+import queue
+import threading
+import re
+import itertools
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Mapping, Sequence
+from contextlib import contextmanager
+from functools import cached_property
 
-# Initialize pygame
-pygame.init()
+import answers
+import audio
+import conjugation
+import scheduler
+import search
+import sessionlog
 
 # Screen dimensions
 WIDTH, HEIGHT = 900, 650
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Арабский Глагольный Квиз")
+WINDOW_TITLE = "Арабский Глагольный Квиз"
 
 # Colors
 BACKGROUND = (240, 240, 230)
@@ -27,14 +45,32 @@ EXIT_BUTTON_HOVER = (210, 90, 90)
 SCROLLBAR_COLOR = (150, 150, 150)
 SCROLLBAR_HOVER = (120, 120, 120)
 
+# Where resolved font paths are remembered between launches, so later starts
+# skip the system font scan behind pygame.font.SysFont
+FONT_CACHE_PATH = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "arabpython", "fonts.json"
+)
+
+# Spaced-repetition progress journal, kept between sessions
+PROGRESS_PATH = os.path.join(
+    os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+    "arabpython", "progress.jsonl"
+)
+
+# Log of questions, reveals and answers, for seeing which forms are hard
+SESSION_LOG_PATH = os.path.join(os.path.dirname(PROGRESS_PATH), "sessions.sqlite3")
+
 # Load Arabic font from file
-def load_arabic_font():
+def load_arabic_font(cached_path=None):
     font_paths = [
         os.path.join(os.path.dirname(__file__), "NotoSansArabic.ttf"),
         os.path.join(os.path.dirname(sys.executable), "NotoSansArabic.ttf"),
         os.path.join(os.path.dirname(os.path.abspath(__file__)), "NotoSansArabic.ttf"),
         "NotoSansArabic.ttf"  # Try current directory
     ]
+    if cached_path:
+        font_paths.insert(0, cached_path)
     
     for font_path in font_paths:
         try:
@@ -43,30 +79,185 @@ def load_arabic_font():
                 arabic_font.set_script("Arab")
                 arabic_font.set_direction(pygame.DIRECTION_RTL)
                 print(f"Successfully loaded font from: {font_path}")
-                return arabic_font
+                return arabic_font, font_path
         except Exception as e:
             print(f"Error loading font from {font_path}: {e}")
             continue
     
     print("Custom Arabic font not found. Falling back to system font.")
-    return pygame.font.SysFont("Arial", 32)
+    return None, None
+
+def make_font(font_path, size, bold=False):
+    # Same construction pygame.font.SysFont uses for a resolved path
+    font = pygame.font.Font(font_path, size)
+    if bold:
+        font.set_bold(True)
+    return font
+
+# Frame profiler
+#
+# Every screen loop is one frame. The screens call profiler.lap() after their
+# event handling, layout and draw phases, and hot paths bump named counters
+# (font renders, blits). Recent frames are kept for the F3 overlay and can be
+# dumped to a JSON or CSV trace with F4 or the --trace command line option.
+TRACE_FIELDS = ("time", "screen", "frame_ms", "events_ms", "layout_ms", "draw_ms",
+                "events", "redraws", "full_redraws", "font_renders", "blits")
+TRACE_HISTORY = 3600  # Frames kept when not tracing a whole session
+
+class Profiler:
+    def __init__(self, history=TRACE_HISTORY):
+        self.created = time.perf_counter()
+        self.frames = deque(maxlen=history)
+        self.overlay_visible = False
+        self.current = None
+        self.counters = {}
+        self.lap_start = 0
+        self.status = None  # Outcome of the last F4 dump, shown on the overlay
+        
+    def keep_all_frames(self):
+        self.frames = deque(self.frames)
+        
+    def start_frame(self, screen_name, event_count):
+        now = time.perf_counter()
+        self.frame_start = self.lap_start = now
+        self.counters = {}
+        self.current = {
+            "time": round(now - self.created, 4),
+            "screen": screen_name,
+            "events": event_count,
+            "events_ms": 0.0,
+            "layout_ms": 0.0,
+            "draw_ms": 0.0,
+        }
+        
+    def lap(self, phase):
+        # Charge the time since the previous lap to the given phase
+        if self.current is None:
+            return
+        now = time.perf_counter()
+        self.current[phase + "_ms"] += (now - self.lap_start) * 1000
+        self.lap_start = now
+        
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+        
+    def end_frame(self):
+        if self.current is None:
+            return
+        frame = self.current
+        # Work time up to the last lap, without the frame-rate sleep
+        frame["frame_ms"] = (self.lap_start - self.frame_start) * 1000
+        for name in ("redraws", "full_redraws", "font_renders", "blits"):
+            frame[name] = self.counters.get(name, 0)
+        self.frames.append(frame)
+        self.current = None
+        
+    def last_frame(self):
+        return self.frames[-1] if self.frames else None
+        
+    def fps(self):
+        # Frames actually drawn during the last second
+        cutoff = time.perf_counter() - self.created - 1.0
+        drawn = 0
+        for frame in reversed(self.frames):
+            if frame["time"] < cutoff:
+                break
+            drawn += frame["redraws"]
+        return drawn
+        
+    def dump(self, path):
+        frames = list(self.frames)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            if path.lower().endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=TRACE_FIELDS, restval=0, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(frames)
+            else:
+                json.dump({"frames": frames}, f, ensure_ascii=False)
+        print(f"Wrote {len(frames)} frames to {path}")
+
+profiler = Profiler()
+
+def blit(surface, source, dest):
+    profiler.count("blits")
+    return surface.blit(source, dest)
+
+# Cache of rendered text surfaces shared by every draw path.
+# Rendering with arabic_font runs a full HarfBuzz RTL shaping pass, so strings
+# that do not change between frames are rendered once and reused.
+# Cached surfaces are shared: callers must only blit them, never draw on them.
+class TextRenderCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024, max_items=4096):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        profiler.count("font_renders")
+        surface = font.render(text, antialias, color)
+        size = surface.get_width() * surface.get_height() * surface.get_bytesize()
+        self.entries[key] = surface
+        self.total_bytes += size
+
+        # Evict least recently used surfaces until we are back within budget
+        while len(self.entries) > 1 and (self.total_bytes > self.max_bytes or len(self.entries) > self.max_items):
+            _, old = self.entries.popitem(last=False)
+            self.total_bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+            self.evictions += 1
+        return surface
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "items": len(self.entries),
+            "bytes": self.total_bytes,
+        }
 
-# Load the font
-arabic_font = load_arabic_font()
+text_cache = TextRenderCache()
 
-# Other fonts
-title_font = pygame.font.SysFont("Arial", 40, bold=True)
-question_font = pygame.font.SysFont("Arial", 32)
-answer_font = pygame.font.SysFont("Arial", 28)
-button_font = pygame.font.SysFont("Arial", 24)
-meaning_font = pygame.font.SysFont("Arial", 26)
-tense_font = pygame.font.SysFont("Arial", 36, bold=True)
-verb_font = pygame.font.SysFont("Arial", 30)
+def render_text(font, text, color, antialias=True):
+    return text_cache.render(font, text, color, antialias)
+
+VERBS_JSON = 'verbs.json'
+VERBS_BIN = 'verbs.bin'
+TENSES = conjugation.TENSES
+
+# Every *.json deck in this directory is loaded next to verbs.json. Their
+# compiled databases are kept in the user cache directory.
+DECKS_DIR = 'decks'
+DECK_CACHE_DIR = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "arabpython", "decks"
+)
+DECK_READ_CHUNK = 64 * 1024
 
 # Load verbs from JSON file
-def load_verbs():
+def load_verbs_json(json_path=VERBS_JSON):
     try:
-        with open('verbs.json', 'r', encoding='utf-8') as f:
+        with open(json_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
             return data["verbs"]
     except FileNotFoundError:
@@ -84,7 +275,1051 @@ def load_verbs():
             }
         ]
 
-verbs_db = load_verbs()
+# Incremental reader for deck files: yields the entries of the "verbs" array
+# one at a time while reading the file in chunks, so a deck is never held in
+# memory as a whole. Other top-level keys (deck metadata) are skipped.
+class DeckStream:
+    def __init__(self, f, chunk_size=DECK_READ_CHUNK):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        
+    def more(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+        
+    def peek(self):
+        # Next non-whitespace character, without consuming it
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.more():
+                raise ValueError("unexpected end of deck file")
+                
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} in deck file, found {self.buffer[self.pos]!r}")
+        self.pos += 1
+        
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Most likely cut off at the end of the chunk
+                if self.more():
+                    continue
+                raise
+            # A number cut off by the chunk ("1." of "1.5") decodes too early;
+            # make sure the character that ends it has been read
+            if isinstance(value, (int, float)) and not self.eof and not self.number_ends(end) and self.more():
+                continue
+            self.pos = end
+            return value
+            
+    def number_ends(self, end):
+        for char in self.buffer[end:]:
+            if char in ",]} \t\r\n":
+                return True
+            if char not in "0123456789.eE+-":
+                return False
+        return False
+
+def iter_deck_verbs(json_path, chunk_size=DECK_READ_CHUNK):
+    with open(json_path, 'r', encoding='utf-8') as f:
+        stream = DeckStream(f, chunk_size)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "verbs":
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.pos += 1
+                else:
+                    while True:
+                        yield stream.value()
+                        if stream.peek() != ",":
+                            break
+                        stream.pos += 1
+                    stream.expect("]")
+            else:
+                stream.value()
+            if stream.peek() != ",":
+                break
+            stream.pos += 1
+        stream.expect("}")
+
+def verb_key_hash(infinitive, root):
+    # 64-bit identity of a verb, used to drop duplicates across decks
+    digest = hashlib.blake2b(f"{infinitive}\0{root or ''}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+# Compiled verb database (verbs.bin)
+#
+# Layout, all integers little-endian:
+#   header   magic, version, verb count and the offsets of the sections below
+#   index    one fixed-size entry per verb: string refs for infinitive,
+#            meaning, root and extra keys (JSON), plus past/present table offsets
+#   keys     one u64 verb_key_hash per verb, for merging decks without
+#            decoding their strings
+#   tables   per tense: u32 row count, then per row string refs for pronoun,
+#            conjugation, meaning and extra keys (JSON)
+#   pool     deduplicated UTF-8 strings
+# A string ref is (offset, length) into the pool; MISSING marks an absent key.
+VERB_DB_MAGIC = b"AVDB"
+VERB_DB_VERSION = 2
+VERB_DB_HEADER = struct.Struct("<4sHHIIIII")
+VERB_DB_KEY = struct.Struct("<Q")
+VERB_DB_ENTRY = struct.Struct("<10I")
+VERB_DB_ROW = struct.Struct("<8I")
+VERB_DB_COUNT = struct.Struct("<I")
+VERB_DB_MISSING = 0xFFFFFFFF
+VERB_FIELDS = ("infinitive", "meaning", "root")
+PRONOUN_FIELDS = ("pronoun", "conjugation", "meaning")
+
+def compile_verbs(json_path=VERBS_JSON, compiled_path=VERBS_BIN):
+    pool = bytearray()
+    pool_offsets = {}
+    
+    def string_ref(text):
+        if text is None:
+            return (VERB_DB_MISSING, 0)
+        ref = pool_offsets.get(text)
+        if ref is None:
+            encoded = text.encode('utf-8')
+            ref = (len(pool), len(encoded))
+            pool_offsets[text] = ref
+            pool.extend(encoded)
+        return ref
+    
+    def extra_ref(record, known_fields):
+        extra = {key: value for key, value in record.items() if key not in known_fields}
+        return string_ref(json.dumps(extra, ensure_ascii=False) if extra else None)
+    
+    index = bytearray()
+    keys = bytearray()
+    tables = bytearray()
+    count = 0
+    for verb in iter_deck_verbs(json_path):
+        count += 1
+        table_offsets = []
+        for tense in TENSES:
+            if tense not in verb:
+                table_offsets.append(VERB_DB_MISSING)
+                continue
+            table_offsets.append(len(tables))
+            tables.extend(VERB_DB_COUNT.pack(len(verb[tense])))
+            for row in verb[tense]:
+                refs = [string_ref(row.get(field)) for field in PRONOUN_FIELDS]
+                refs.append(extra_ref(row, PRONOUN_FIELDS))
+                tables.extend(VERB_DB_ROW.pack(*[value for ref in refs for value in ref]))
+        
+        refs = [string_ref(verb.get(field)) for field in VERB_FIELDS]
+        refs.append(extra_ref(verb, VERB_FIELDS + TENSES))
+        index.extend(VERB_DB_ENTRY.pack(*[value for ref in refs for value in ref], *table_offsets))
+        keys.extend(VERB_DB_KEY.pack(verb_key_hash(verb["infinitive"], verb.get("root"))))
+    
+    index_offset = VERB_DB_HEADER.size
+    keys_offset = index_offset + len(index)
+    tables_offset = keys_offset + len(keys)
+    pool_offset = tables_offset + len(tables)
+    header = VERB_DB_HEADER.pack(VERB_DB_MAGIC, VERB_DB_VERSION, 0, count,
+                                 index_offset, keys_offset, tables_offset, pool_offset)
+    
+    # Write to a temporary file first so a crash never leaves a half-written database
+    temp_path = compiled_path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(index)
+        f.write(keys)
+        f.write(tables)
+        f.write(pool)
+    os.replace(temp_path, compiled_path)
+    print(f"Compiled {count} verbs into {compiled_path}")
+
+# Read-only view of verbs.bin. Verbs are decoded from the memory map on first
+# access, and each verb decodes its past/present tables only when asked for them.
+class CompiledVerbDB(Sequence):
+    def __init__(self, compiled_path=VERBS_BIN):
+        with open(compiled_path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version = struct.unpack_from("<4sH", self.data, 0)
+        if magic != VERB_DB_MAGIC or version != VERB_DB_VERSION:
+            self.data.close()
+            raise ValueError(f"{compiled_path} is not a compiled verb database (version {VERB_DB_VERSION})")
+        _, _, _, count, index_offset, keys_offset, tables_offset, pool_offset = VERB_DB_HEADER.unpack_from(self.data, 0)
+        
+        self.count = count
+        self.index_offset = index_offset
+        self.keys_offset = keys_offset
+        self.tables_offset = tables_offset
+        self.pool_offset = pool_offset
+        self.verbs = [None] * count
+        
+    def __len__(self):
+        return self.count
+        
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("verb index out of range")
+        verb = self.verbs[index]
+        if verb is None:
+            verb = CompiledVerb(self, index)
+            self.verbs[index] = verb
+        return verb
+        
+    def string(self, offset, length):
+        if offset == VERB_DB_MISSING:
+            return None
+        start = self.pool_offset + offset
+        return self.data[start:start + length].decode('utf-8')
+        
+    def entry(self, index):
+        return VERB_DB_ENTRY.unpack_from(self.data, self.index_offset + index * VERB_DB_ENTRY.size)
+        
+    def key_hashes(self):
+        # verb_key_hash of every verb, read straight from the map
+        end = self.keys_offset + self.count * VERB_DB_KEY.size
+        return memoryview(self.data)[self.keys_offset:end].cast('Q')
+        
+    def table(self, table_offset):
+        start = self.tables_offset + table_offset
+        (count,) = VERB_DB_COUNT.unpack_from(self.data, start)
+        start += VERB_DB_COUNT.size
+        rows = []
+        for values in VERB_DB_ROW.iter_unpack(self.data[start:start + count * VERB_DB_ROW.size]):
+            row = {}
+            for field, offset, length in zip(PRONOUN_FIELDS, values[0:6:2], values[1:6:2]):
+                if offset != VERB_DB_MISSING:
+                    row[field] = self.string(offset, length)
+            if values[6] != VERB_DB_MISSING:
+                row.update(json.loads(self.string(values[6], values[7])))
+            rows.append(row)
+        return rows
+
+# A single verb from CompiledVerbDB, used exactly like the dicts from verbs.json
+class CompiledVerb(Mapping):
+    def __init__(self, db, index):
+        self.db = db
+        self.index = index
+        self.entry = db.entry(index)
+        self.fields = {}
+        self.extra = None
+        
+    def extra_fields(self):
+        if self.extra is None:
+            offset, length = self.entry[6], self.entry[7]
+            self.extra = json.loads(self.db.string(offset, length)) if offset != VERB_DB_MISSING else {}
+        return self.extra
+        
+    def __getitem__(self, key):
+        if key in self.fields:
+            return self.fields[key]
+        if key in VERB_FIELDS:
+            i = VERB_FIELDS.index(key) * 2
+            if self.entry[i] == VERB_DB_MISSING:
+                raise KeyError(key)
+            value = self.db.string(self.entry[i], self.entry[i + 1])
+        elif key in TENSES:
+            table_offset = self.entry[8 + TENSES.index(key)]
+            if table_offset == VERB_DB_MISSING:
+                raise KeyError(key)
+            value = self.db.table(table_offset)
+        else:
+            value = self.extra_fields()[key]
+        self.fields[key] = value
+        return value
+        
+    def keys_present(self):
+        keys = [field for i, field in enumerate(VERB_FIELDS) if self.entry[i * 2] != VERB_DB_MISSING]
+        keys += [tense for i, tense in enumerate(TENSES) if self.entry[8 + i] != VERB_DB_MISSING]
+        return keys + list(self.extra_fields())
+        
+    def __iter__(self):
+        return iter(self.keys_present())
+        
+    def __len__(self):
+        return len(self.keys_present())
+
+# Load verbs, preferring the compiled database and rebuilding it when
+# verbs.json is newer or was compiled by another version. Falls back to
+# reading verbs.json directly.
+def load_verbs(json_path=VERBS_JSON, compiled_path=VERBS_BIN):
+    if os.path.exists(json_path):
+        if not os.path.exists(compiled_path) or os.path.getmtime(json_path) > os.path.getmtime(compiled_path):
+            try:
+                compile_verbs(json_path, compiled_path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Could not compile {json_path}: {e}. Loading it directly.")
+                return load_verbs_json(json_path)
+    
+    if os.path.exists(compiled_path):
+        try:
+            return CompiledVerbDB(compiled_path)
+        except (OSError, ValueError, struct.error) as e:
+            if os.path.exists(json_path):
+                try:
+                    compile_verbs(json_path, compiled_path)
+                    return CompiledVerbDB(compiled_path)
+                except (OSError, ValueError, KeyError, TypeError, struct.error):
+                    pass
+            print(f"Could not open {compiled_path}: {e}. Loading {json_path} directly.")
+    
+    return load_verbs_json(json_path)
+
+def find_decks(decks_dir=DECKS_DIR, json_path=VERBS_JSON):
+    # verbs.json first, then the deck directory in name order; earlier decks
+    # win when the same verb appears twice
+    paths = [json_path] if os.path.exists(json_path) else []
+    if decks_dir and os.path.isdir(decks_dir):
+        paths += sorted(os.path.join(decks_dir, name) for name in os.listdir(decks_dir)
+                        if name.lower().endswith(".json"))
+    return paths
+
+def deck_compiled_path(json_path, cache_dir=DECK_CACHE_DIR):
+    # One cache file per deck path, so two "basic.json" in different folders do not clash
+    name = os.path.splitext(os.path.basename(json_path))[0]
+    digest = hashlib.blake2b(os.path.abspath(json_path).encode('utf-8'), digest_size=4).hexdigest()
+    return os.path.join(cache_dir, f"{name}-{digest}.bin")
+
+def deck_key_hashes(deck):
+    if isinstance(deck, CompiledVerbDB):
+        return deck.key_hashes()
+    return [verb_key_hash(verb["infinitive"], verb.get("root")) for verb in deck]
+
+# Several decks seen as one verb sequence, without verbs that an earlier
+# deck (or an earlier entry of the same deck) already has. Only the key hashes of each deck are read to merge them;
+# verbs and their tables still decode from the decks on first use.
+#
+# Deck reloads (see DeckWatcher) never move a verb: a changed verb keeps its
+# index, an added one gets the next free index and a removed one leaves a
+# REMOVED_VERB behind. Those verbs are kept in overrides; the rest still
+# comes from the decks loaded at startup.
+REMOVED_VERB = {"infinitive": "", "meaning": ""}
+
+class MergedVerbDB(Sequence):
+    def __init__(self, decks):
+        self.decks = []
+        self.kept = []  # per deck: local indices of the verbs kept, or None for all of them
+        self.starts = []  # merged index of each deck's first verb
+        self.count = 0
+        self.overrides = {}  # merged index -> (deck, local index), or None for a removed verb
+        seen = set()
+        for deck in decks:
+            # A single deck is deduplicated too, the same way DeckWatcher
+            # does on reload, so the grid does not change under the user
+            kept = array('I')
+            duplicates = 0
+            for local_index, key in enumerate(deck_key_hashes(deck)):
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+                kept.append(local_index)
+            self.decks.append(deck)
+            self.kept.append(kept if duplicates else None)
+            self.starts.append(self.count)
+            self.count += len(kept) if duplicates else len(deck)
+        self.base_count = self.count
+        
+    def __len__(self):
+        return self.count
+        
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("verb index out of range")
+        if index in self.overrides:
+            slot = self.overrides[index]
+            if slot is None:
+                return REMOVED_VERB
+            deck, local_index = slot
+            return deck[local_index]
+        deck_index = bisect.bisect_right(self.starts, index) - 1
+        local_index = index - self.starts[deck_index]
+        kept = self.kept[deck_index]
+        return self.decks[deck_index][local_index if kept is None else kept[local_index]]
+        
+    def apply(self, change):
+        self.overrides.update(change.slots)
+        self.count = change.count
+
+def load_decks(deck_paths, json_path=VERBS_JSON, compiled_path=VERBS_BIN, cache_dir=DECK_CACHE_DIR):
+    if not deck_paths:
+        return MergedVerbDB([load_verbs(json_path, compiled_path)])
+    decks = []
+    for path in deck_paths:
+        if path == json_path:
+            decks.append(load_verbs(json_path, compiled_path))
+            continue
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError as e:
+            print(f"Could not create {cache_dir}: {e}. Loading {path} directly.")
+            decks.append(load_verbs_json(path))
+            continue
+        decks.append(load_verbs(path, deck_compiled_path(path, cache_dir)))
+    return MergedVerbDB(decks)
+
+# Hot reload of deck files while the app runs.
+#
+# A worker thread stats every deck (and the deck directory) once per
+# DECK_POLL_INTERVAL; when the modification time or size changed it hashes
+# the file, and only when the content changed it parses that one deck and
+# diffs it against the merged view by verb key. The resulting DeckChange is
+# queued and a DECKS_CHANGED event wakes the screen up to apply it between
+# frames. Reloaded decks stay in memory as parsed lists; they are compiled
+# again on the next start.
+DECK_POLL_INTERVAL = 1.0
+DECKS_CHANGED = pygame.event.custom_type()
+
+def deck_file_state(path):
+    # (modification time, size), or None when the file is gone
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DECK_READ_CHUNK), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+def deck_verb(deck, index):
+    # Decode one verb for comparison without keeping it in the deck's cache
+    if isinstance(deck, CompiledVerbDB):
+        return dict(CompiledVerb(deck, index))
+    return deck[index]
+
+class DeckChange:
+    def __init__(self, count):
+        self.slots = {}  # merged index -> (deck, local index), or None when removed
+        self.count = count  # verb count after the change
+        self.changed = set()  # indices whose verb was edited or now comes from another deck
+        self.added = range(count, count)
+        self.removed = set()
+        
+    def merge(self, later):
+        # Two changes applied in one go
+        self.slots.update(later.slots)
+        self.changed = (self.changed | later.changed) - later.removed
+        self.added = range(self.added.start, later.count)
+        self.removed |= later.removed
+        self.count = later.count
+
+class DeckWatcher:
+    def __init__(self, merged, deck_paths, decks_dir=DECKS_DIR, json_path=VERBS_JSON, interval=DECK_POLL_INTERVAL):
+        self.merged = merged
+        self.paths = list(deck_paths)  # In priority order, as find_decks returns them
+        self.decks_dir = decks_dir
+        self.json_path = json_path
+        self.interval = interval
+        self.changes = queue.Queue()
+        self.decks = {}  # path -> current deck
+        self.keys = {}  # path -> key hash of every verb of the current deck
+        self.states = {}  # path -> deck_file_state
+        self.digests = {}  # path -> file_digest
+        self.index_of = {}  # key hash -> merged index
+        self.owner = {}  # key hash -> path of the deck the verb comes from
+        self.count = len(merged)
+        
+    def start(self):
+        thread = threading.Thread(target=self.run, name="deck-watcher", daemon=True)
+        thread.start()
+        return thread
+        
+    def run(self):
+        self.scan_initial()
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.poll()
+            except OSError as e:
+                print(f"Could not check decks for changes: {e}")
+                
+    def scan_initial(self):
+        # Same order and first-wins rule as MergedVerbDB, so indices line up
+        paths = self.paths if len(self.paths) == len(self.merged.decks) else [None] * len(self.merged.decks)
+        index = 0
+        for path, deck, kept in zip(paths, self.merged.decks, self.merged.kept):
+            keys = deck_key_hashes(deck)
+            for local_index in (range(len(deck)) if kept is None else kept):
+                key = keys[local_index]
+                self.index_of[key] = index
+                self.owner[key] = path
+                index += 1
+            if path is not None:
+                self.decks[path] = deck
+                self.keys[path] = keys
+                self.states[path] = deck_file_state(path)
+                try:
+                    self.digests[path] = file_digest(path)
+                except OSError:
+                    pass
+        
+    def poll(self):
+        paths = find_decks(self.decks_dir, self.json_path)
+        reloaded = {}
+        for path in dict.fromkeys(paths + self.paths):
+            state = deck_file_state(path)
+            if state == self.states.get(path):
+                continue
+            self.states[path] = state
+            digest = file_digest(path) if state else None
+            if digest == self.digests.get(path):
+                continue  # Touched or rewritten with the same content
+            try:
+                verbs = list(iter_deck_verbs(path)) if state else []
+                keys = [verb_key_hash(verb["infinitive"], verb.get("root")) for verb in verbs]
+            except (ValueError, KeyError, TypeError) as e:
+                # Often a file caught halfway through saving; the next save is picked up again
+                print(f"Could not reload {path}: {e}")
+                continue
+            self.digests[path] = digest
+            reloaded[path] = verbs, keys
+        if paths != self.paths or reloaded:
+            self.paths = paths
+            change = self.diff(reloaded)
+            if change.slots:
+                self.changes.put(change)
+                pygame.event.post(pygame.event.Event(DECKS_CHANGED))
+                
+    def diff(self, reloaded):
+        old_decks = {}
+        for path, (verbs, keys) in reloaded.items():
+            old_decks[path] = self.decks.get(path), self.keys.get(path)
+            self.decks[path] = verbs
+            self.keys[path] = keys
+        
+        # Which deck every verb comes from now, first deck wins
+        winners = {}
+        for path in self.paths:
+            for local_index, key in enumerate(self.keys.get(path, ())):
+                if key not in winners:
+                    winners[key] = path, local_index
+        
+        change = DeckChange(self.count)
+        
+        # Where each verb was in the previous version of a reloaded deck (first copy)
+        old_local = {path: {key: local_index for local_index, key in reversed(list(enumerate(keys or ())))}
+                     for path, (_, keys) in old_decks.items()}
+        for key, (path, local_index) in winners.items():
+            deck = self.decks[path]
+            index = self.index_of.get(key)
+            if index is None:
+                index = change.count
+                change.count += 1
+                self.index_of[key] = index
+            elif self.owner[key] == path:
+                if path not in reloaded:
+                    continue
+                old_deck = old_decks[path][0]
+                old_index = old_local[path].get(key)
+                if old_index is not None and deck_verb(old_deck, old_index) == deck[local_index]:
+                    continue
+                change.changed.add(index)
+            else:
+                change.changed.add(index)
+            self.owner[key] = path
+            change.slots[index] = deck, local_index
+        
+        for key in [key for key in self.index_of if key not in winners]:
+            index = self.index_of.pop(key)
+            del self.owner[key]
+            change.slots[index] = None
+            change.removed.add(index)
+        change.added = range(self.count, change.count)
+        self.count = change.count
+        return change
+
+# Compact in-memory verb model used by the screens.
+# Every (pronoun, meaning) pair is stored once in a shared pronoun table and
+# conjugations live in one flat verbs x tense x pronoun-index list of interned
+# strings, instead of each verb repeating the pronoun dicts for every tense.
+# Rows are filled from the source deck the first time a verb is used, so the
+# compiled database still decodes only the verbs that are actually shown.
+class VerbRecord:
+    __slots__ = ("infinitive", "meaning", "root", "extra")
+    
+    def __init__(self, infinitive, meaning, root=None, extra=None):
+        self.infinitive = infinitive
+        self.meaning = meaning
+        self.root = root
+        self.extra = extra  # Any other deck keys, or None
+
+ANSWER_KEY_CACHE = 256  # Split forms kept by VerbTable.form_key
+
+class VerbTable:
+    def __init__(self, verbs):
+        self.source = verbs
+        self.pronouns = []  # pronoun index -> (pronoun, meaning)
+        self.pronoun_index = {}
+        self.stride = 0  # pronoun slots per (verb, tense) row
+        self.records = [None] * len(verbs)
+        self.loaded = bytearray(len(verbs))
+        self.conjugations = []
+        self.lookup = None  # (infinitive, root) -> verb index, built on first find()
+        self.answer_keys = OrderedDict()  # conjugation -> answers.AnswerKey, recently checked forms only
+        self.audio = {}  # (verb, tense, pronoun index) -> clip of the form, for decks with audio
+        self.pronoun_audio = {}  # pronoun index -> clip of the pronoun
+        self.removed = set()  # Indices of verbs a deck reload took out
+        
+    def __len__(self):
+        return len(self.records)
+        
+    def verb(self, verb_index):
+        record = self.records[verb_index]
+        if record is None:
+            verb = self.source[verb_index]
+            extra = {key: verb[key] for key in verb if key not in VERB_FIELDS and key not in TENSES}
+            record = VerbRecord(
+                sys.intern(verb["infinitive"]), sys.intern(verb["meaning"]),
+                sys.intern(verb["root"]) if "root" in verb else None, extra or None
+            )
+            self.records[verb_index] = record
+        return record
+        
+    def add_pronoun(self, pronoun, meaning):
+        key = (sys.intern(pronoun), sys.intern(meaning))
+        index = self.pronoun_index.get(key)
+        if index is None:
+            index = len(self.pronouns)
+            self.pronouns.append(key)
+            self.pronoun_index[key] = index
+            if index >= self.stride:
+                self.grow(index + 1)
+        return index
+        
+    def grow(self, stride):
+        # A new pronoun appeared: re-lay the table out with a wider row.
+        # Only happens a handful of times per deck.
+        old_stride = self.stride
+        old = self.conjugations
+        rows = len(self.records) * len(TENSES)
+        self.conjugations = [None] * (rows * stride)
+        if old_stride:
+            for row in range(rows):
+                self.conjugations[row * stride:row * stride + old_stride] = old[row * old_stride:(row + 1) * old_stride]
+        self.stride = stride
+        
+    def load(self, verb_index):
+        if self.loaded[verb_index]:
+            return
+        verb = self.source[verb_index]
+        # A compact entry the rules cannot conjugate (weak root, unknown
+        # pattern) is reported and left without forms, so it has no cards
+        error = None
+        if "pattern" in verb and not all(tense in verb for tense in TENSES):
+            error = conjugation.compact_error(verb)
+            if error is not None:
+                print(f"Cannot conjugate {verb.get('infinitive')}: {error}")
+        for tense_index, tense in enumerate(TENSES):
+            forms = verb.get(tense)
+            if forms is None and "pattern" in verb and error is None:
+                # Compact deck entry: generate the table from root and pattern
+                forms = conjugation.conjugate_verb(verb, tense)
+            for form in forms or ():
+                pronoun_index = self.add_pronoun(form["pronoun"], form.get("meaning", ""))
+                slot = (verb_index * len(TENSES) + tense_index) * self.stride + pronoun_index
+                if "audio" in form:
+                    self.audio[(verb_index, tense_index, pronoun_index)] = form["audio"]
+                if "pronoun_audio" in form:
+                    self.pronoun_audio.setdefault(pronoun_index, form["pronoun_audio"])
+                self.conjugations[slot] = sys.intern(form["conjugation"])
+        self.loaded[verb_index] = 1
+        
+    def conjugation(self, verb_index, tense_index, pronoun_index):
+        self.load(verb_index)
+        if pronoun_index >= self.stride:
+            return None
+        return self.conjugations[(verb_index * len(TENSES) + tense_index) * self.stride + pronoun_index]
+        
+    def answer_key(self, verb_index, tense_index, pronoun_index):
+        form = self.conjugation(verb_index, tense_index, pronoun_index)
+        return None if form is None else self.form_key(form)
+        
+    def form_key(self, form):
+        # Split on first use and kept for the few forms on screen, so the
+        # table does not hold a key for every form of the deck
+        key = self.answer_keys.get(form)
+        if key is not None:
+            self.answer_keys.move_to_end(form)
+            return key
+        key = answers.AnswerKey(form)
+        self.answer_keys[form] = key
+        if len(self.answer_keys) > ANSWER_KEY_CACHE:
+            self.answer_keys.popitem(last=False)
+        return key
+        
+    def form_audio(self, verb_index, tense_index, pronoun_index):
+        # (pronoun clip, form clip); either is None when the deck has none
+        self.load(verb_index)
+        return self.pronoun_audio.get(pronoun_index), self.audio.get((verb_index, tense_index, pronoun_index))
+        
+    def infinitive_audio(self, verb_index):
+        extra = self.verb(verb_index).extra
+        return extra.get("audio") if extra else None
+        
+    def pronoun_indices(self, verb_index, tense_index):
+        # Pronouns that have a form for this verb and tense
+        self.load(verb_index)
+        start = (verb_index * len(TENSES) + tense_index) * self.stride
+        row = self.conjugations[start:start + self.stride]
+        return [i for i, form in enumerate(row) if form is not None]
+        
+    def find(self, infinitive, root):
+        if self.lookup is None:
+            self.lookup = {}
+            for verb_index in range(len(self.records)):
+                verb = self.verb(verb_index)
+                self.lookup.setdefault((verb.infinitive, verb.root), verb_index)
+        return self.lookup.get((infinitive, root))
+        
+    def find_pronoun(self, pronoun):
+        for index, (name, meaning) in enumerate(self.pronouns):
+            if name == pronoun:
+                return index
+        return None
+        
+    def load_all(self):
+        for verb_index in range(len(self.records)):
+            self.verb(verb_index)
+            self.load(verb_index)
+            
+    def apply(self, change):
+        # After a deck reload: forget the rows of changed and removed verbs,
+        # so they load again from the source, and make room for added ones
+        added = change.count - len(self.records)
+        if added > 0:
+            self.records.extend([None] * added)
+            self.loaded.extend(bytes(added))
+            self.conjugations.extend([None] * (added * len(TENSES) * self.stride))
+        row_size = len(TENSES) * self.stride
+        stale = set(itertools.chain(change.changed, change.removed))
+        if self.audio:
+            self.audio = {key: clip for key, clip in self.audio.items() if key[0] not in stale}
+        for verb_index in stale:
+            self.records[verb_index] = None
+            if self.loaded[verb_index]:
+                start = verb_index * row_size
+                self.conjugations[start:start + row_size] = [None] * row_size
+                self.loaded[verb_index] = 0
+        self.removed |= change.removed
+        self.lookup = None
+        
+    def shown_indices(self):
+        # Verbs the selection grid lists: all of them, unless a reload removed some
+        if not self.removed:
+            return None
+        return array('I', [verb_index for verb_index in range(len(self.records)) if verb_index not in self.removed])
+
+def search_fields(verb_table):
+    # What the verb search matches on, one tuple per verb
+    for verb_index in range(len(verb_table)):
+        verb = verb_table.verb(verb_index)
+        yield verb.infinitive, verb.root, verb.meaning
+
+# Where the screens get events, the mouse position and their frame clock from.
+# The benchmark harness swaps in a replay of scripted or recorded events.
+class PygameInput:
+    def poll(self):
+        return pygame.event.get()
+        
+    def wait(self, timeout):
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+        
+    def mouse_pos(self):
+        return pygame.mouse.get_pos()
+        
+    def clock(self):
+        return pygame.time.Clock()
+
+# Input events worth recording, by the names used in recorded session files
+RECORDED_EVENT_TYPES = {
+    "QUIT": pygame.QUIT,
+    "MOUSEMOTION": pygame.MOUSEMOTION,
+    "MOUSEBUTTONDOWN": pygame.MOUSEBUTTONDOWN,
+    "MOUSEBUTTONUP": pygame.MOUSEBUTTONUP,
+    "MOUSEWHEEL": pygame.MOUSEWHEEL,
+    "KEYDOWN": pygame.KEYDOWN,
+    "KEYUP": pygame.KEYUP,
+    "TEXTINPUT": pygame.TEXTINPUT,
+}
+
+def event_to_record(event):
+    name = next(name for name, event_type in RECORDED_EVENT_TYPES.items() if event_type == event.type)
+    attributes = {key: list(value) if isinstance(value, tuple) else value
+                  for key, value in event.dict.items()
+                  if isinstance(value, (int, float, str, bool, tuple))}
+    return {"type": name, **attributes}
+
+def event_from_record(record):
+    attributes = {key: tuple(value) if isinstance(value, list) else value
+                  for key, value in record.items() if key != "type"}
+    return pygame.event.Event(RECORDED_EVENT_TYPES[record["type"]], **attributes)
+
+# Records every input frame of a real session, for replay by benchmark.py
+class RecordingInput(PygameInput):
+    def __init__(self, path):
+        self.path = path
+        self.frames = []
+        self.start = time.perf_counter()
+        
+    def record(self, events):
+        recorded = [event_to_record(event) for event in events if event.type in RECORDED_EVENT_TYPES.values()]
+        if recorded:
+            self.frames.append({
+                "time": round(time.perf_counter() - self.start, 4),
+                "mouse": list(self.mouse_pos()),
+                "events": recorded,
+            })
+        return events
+        
+    def poll(self):
+        return self.record(super().poll())
+        
+    def wait(self, timeout):
+        return self.record(super().wait(timeout))
+        
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"frames": self.frames}, f, ensure_ascii=False)
+        print(f"Recorded {len(self.frames)} input frames to {self.path}")
+
+# Everything the app needs from pygame and the disk, created lazily and once.
+# Importing this module does not initialize pygame or open a window; the
+# screens pull the window, fonts and verbs from here on first use.
+class AppContext:
+    def __init__(self, json_path=VERBS_JSON, compiled_path=VERBS_BIN, font_cache_path=FONT_CACHE_PATH,
+                 progress_path=PROGRESS_PATH, decks_dir=DECKS_DIR, session_log_path=SESSION_LOG_PATH,
+                 audio_dir=audio.AUDIO_DIR):
+        self.json_path = json_path
+        self.compiled_path = compiled_path
+        self.decks_dir = decks_dir
+        self.font_cache_path = font_cache_path
+        self.progress_path = progress_path
+        self.session_log_path = session_log_path
+        self.audio_dir = audio_dir
+        self.pygame_ready = False
+        self.font_cache = None
+        self.input = PygameInput()
+        self.timings = {}  # startup phase -> seconds
+        self.deck_watcher = None
+        
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0) + time.perf_counter() - start
+        
+    def init_pygame(self):
+        if not self.pygame_ready:
+            with self.phase("pygame.init"):
+                pygame.init()
+            self.pygame_ready = True
+            
+    @cached_property
+    def screen(self):
+        self.init_pygame()
+        with self.phase("window"):
+            screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption(WINDOW_TITLE)
+        return screen
+        
+    def load_font_cache(self):
+        if self.font_cache is None:
+            try:
+                with open(self.font_cache_path, 'r', encoding='utf-8') as f:
+                    self.font_cache = json.load(f)
+            except (OSError, ValueError):
+                self.font_cache = {}
+        return self.font_cache
+        
+    def save_font_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.font_cache_path), exist_ok=True)
+            with open(self.font_cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self.font_cache, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"Could not save font cache to {self.font_cache_path}: {e}")
+            
+    def system_font(self, name, size, bold=False):
+        self.init_pygame()
+        with self.phase("system fonts"):
+            cache = self.load_font_cache()
+            key = f"{name}|{'bold' if bold else 'regular'}"
+            entry = cache.get(key)
+            if entry is not None and (entry["path"] is None or os.path.exists(entry["path"])):
+                return make_font(entry["path"], size, entry["bold"])
+            
+            # Not cached yet: let SysFont scan the system fonts and remember
+            # which file it picked
+            resolved = {}
+            def constructor(font_path, size, set_bold, set_italic):
+                resolved["path"] = font_path
+                resolved["bold"] = set_bold
+                return make_font(font_path, size, set_bold)
+            with self.phase("font discovery"):
+                font = pygame.font.SysFont(name, size, bold=bold, constructor=constructor)
+            cache[key] = resolved
+            self.save_font_cache()
+            return font
+        
+    @cached_property
+    def arabic_font(self):
+        self.init_pygame()
+        with self.phase("arabic font"):
+            cache = self.load_font_cache()
+            font, font_path = load_arabic_font(cache.get("arabic"))
+            if font_path != cache.get("arabic"):
+                cache["arabic"] = font_path
+                self.save_font_cache()
+        if font is None:
+            font = self.system_font("Arial", 32)
+        return font
+        
+    @cached_property
+    def title_font(self):
+        return self.system_font("Arial", 40, bold=True)
+        
+    @cached_property
+    def question_font(self):
+        return self.system_font("Arial", 32)
+        
+    @cached_property
+    def answer_font(self):
+        return self.system_font("Arial", 28)
+        
+    @cached_property
+    def button_font(self):
+        return self.system_font("Arial", 24)
+        
+    @cached_property
+    def meaning_font(self):
+        return self.system_font("Arial", 26)
+        
+    @cached_property
+    def tense_font(self):
+        return self.system_font("Arial", 36, bold=True)
+        
+    @cached_property
+    def verb_font(self):
+        return self.system_font("Arial", 30)
+        
+    @cached_property
+    def debug_font(self):
+        self.init_pygame()
+        return make_font(None, 22)
+        
+    @cached_property
+    def verbs_db(self):
+        with self.phase("verbs"):
+            return load_decks(find_decks(self.decks_dir, self.json_path), self.json_path, self.compiled_path)
+            
+    @cached_property
+    def verb_table(self):
+        return VerbTable(self.verbs_db)
+        
+    @cached_property
+    def search_index(self):
+        # Built on a worker thread; the verb screen filters once it is ready
+        index = search.SearchIndex()
+        index.build_in_background(search_fields(self.verb_table))
+        return index
+        
+    @cached_property
+    def distractor_index(self):
+        # Built on a worker thread; until it is ready wrong options come from the same verb
+        verb_table = self.verb_table
+        index = answers.DistractorIndex()
+        index.build_in_background(verb_table.verb(verb_index).infinitive for verb_index in range(len(verb_table)))
+        return index
+        
+    @cached_property
+    def progress(self):
+        with self.phase("progress"):
+            return scheduler.Scheduler(scheduler.ReviewJournal(self.progress_path))
+            
+    @cached_property
+    def session_log(self):
+        # Written by its own thread; the screens only queue events
+        return sessionlog.SessionLog(self.session_log_path)
+        
+    @cached_property
+    def sounds(self):
+        # Pronunciation clips, decoded ahead of time on a worker thread
+        return audio.SoundCache(self.audio_dir)
+        
+    def watch_decks(self):
+        self.deck_watcher = DeckWatcher(self.verbs_db, find_decks(self.decks_dir, self.json_path),
+                                        self.decks_dir, self.json_path)
+        self.deck_watcher.start()
+        
+    def reload_decks(self):
+        # Apply deck changes the watcher found since the last call; returns
+        # the combined DeckChange, or None when nothing changed
+        if self.deck_watcher is None or self.deck_watcher.changes.empty():
+            return None
+        combined = None
+        while not self.deck_watcher.changes.empty():
+            change = self.deck_watcher.changes.get()
+            self.verbs_db.apply(change)
+            self.verb_table.apply(change)
+            if combined is None:
+                combined = change
+            else:
+                combined.merge(change)
+        # The indices are rebuilt in the background on next use
+        self.__dict__.pop("search_index", None)
+        self.__dict__.pop("distractor_index", None)
+        print(f"Decks reloaded: {len(combined.changed)} changed, {len(combined.added)} added, "
+              f"{len(combined.removed)} removed")
+        return combined
+        
+    def start(self):
+        # Run every startup step now instead of on first use
+        for name in ("screen", "arabic_font", "title_font", "question_font", "answer_font",
+                     "button_font", "meaning_font", "tense_font", "verb_font", "verb_table"):
+            getattr(self, name)
+            
+    def startup_report(self):
+        # "font discovery" is part of "system fonts", so it is not added to the total
+        lines = [f"{name:>16}: {seconds * 1000:8.1f} ms" for name, seconds in self.timings.items()]
+        total = sum(seconds for name, seconds in self.timings.items() if name != "font discovery")
+        lines.append(f"{'total':>16}: {total * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+context = AppContext()
 
 class Button:
     def __init__(self, x, y, width, height, text, color=BUTTON_COLOR, hover_color=BUTTON_HOVER):
@@ -99,9 +1334,9 @@ class Button:
         pygame.draw.rect(surface, color, self.rect, border_radius=8)
         pygame.draw.rect(surface, (30, 30, 30), self.rect, 2, border_radius=8)
         
-        text_surf = button_font.render(self.text, True, (255, 255, 255))
+        text_surf = render_text(context.button_font, self.text, (255, 255, 255))
         text_rect = text_surf.get_rect(center=self.rect.center)
-        surface.blit(text_surf, text_rect)
+        blit(surface, text_surf, text_rect)
         
     def check_hover(self, pos):
         self.hovered = self.rect.collidepoint(pos)
@@ -111,6 +1346,21 @@ class Button:
             return self.rect.collidepoint(pos)
         return False
 
+# Multiple-choice option showing an Arabic form
+class ChoiceButton(Button):
+    def __init__(self, x, y, width, height):
+        super().__init__(x, y, width, height, "", VERB_SELECT_COLOR, BUTTON_HOVER)
+        self.result_color = None  # Set once the answer is shown
+        
+    def draw(self, surface):
+        color = self.result_color or (self.hover_color if self.hovered else self.color)
+        pygame.draw.rect(surface, color, self.rect, border_radius=8)
+        pygame.draw.rect(surface, (30, 30, 30), self.rect, 2, border_radius=8)
+        
+        text_surf = render_text(context.arabic_font, self.text, ARABIC_COLOR)
+        text_rect = text_surf.get_rect(center=self.rect.center)
+        blit(surface, text_surf, text_rect)
+
 class TenseButton:
     def __init__(self, x, y, width, height, text, tense):
         self.rect = pygame.Rect(x, y, width, height)
@@ -128,9 +1378,9 @@ class TenseButton:
         pygame.draw.rect(surface, color, self.rect, border_radius=8)
         pygame.draw.rect(surface, (30, 30, 30), self.rect, 2, border_radius=8)
         
-        text_surf = tense_font.render(self.text, True, TEXT_COLOR)
+        text_surf = render_text(context.tense_font, self.text, TEXT_COLOR)
         text_rect = text_surf.get_rect(center=self.rect.center)
-        surface.blit(text_surf, text_rect)
+        blit(surface, text_surf, text_rect)
         
     def check_hover(self, pos):
         self.hovered = self.rect.collidepoint(pos)
@@ -162,19 +1412,19 @@ class VerbButton:
         # For hard mode button, use regular font instead of Arabic font
         if self.is_hard_mode:
             # Draw Russian text for hard mode
-            text_surf = verb_font.render(self.text, True, ARABIC_COLOR)
+            text_surf = render_text(context.verb_font, self.text, ARABIC_COLOR)
             text_rect = text_surf.get_rect(center=(self.rect.centerx, self.rect.centery - 10))
-            surface.blit(text_surf, text_rect)
+            blit(surface, text_surf, text_rect)
         else:
             # Draw Arabic text for regular verb buttons
-            text_surf = arabic_font.render(self.text, True, ARABIC_COLOR)
+            text_surf = render_text(context.arabic_font, self.text, ARABIC_COLOR)
             text_rect = text_surf.get_rect(center=(self.rect.centerx, self.rect.centery - 10))
-            surface.blit(text_surf, text_rect)
+            blit(surface, text_surf, text_rect)
         
         # Draw meaning
-        meaning_surf = verb_font.render(self.meaning, True, TEXT_COLOR)
+        meaning_surf = render_text(context.verb_font, self.meaning, TEXT_COLOR)
         meaning_rect = meaning_surf.get_rect(center=(self.rect.centerx, self.rect.centery + 15))
-        surface.blit(meaning_surf, meaning_rect)
+        blit(surface, meaning_surf, meaning_rect)
         
     def check_hover(self, pos):
         self.hovered = self.rect.collidepoint(pos)
@@ -250,8 +1500,175 @@ class ScrollBar:
             
         return self.scroll_position
 
+# Single-line text field, used for the verb search and typed answers. Keys
+# typed anywhere on the screen go to it: TEXTINPUT appends, Backspace
+# deletes, Escape clears.
+ARABIC_LETTERS = re.compile("[\u0600-\u06ff]")
+
+class TextField:
+    def __init__(self, x, y, width, height, placeholder, centered=False):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.placeholder = placeholder
+        self.centered = centered
+        self.text = ""
+        self.border_color = (30, 30, 30)
+        self.hovered = False
+        self.shaped_text = None
+        self.shaped = None
+        
+    def text_surface(self):
+        # The typed line changes on every keystroke, so only its latest
+        # shaping is kept here instead of filling the shared text cache
+        if self.shaped_text != self.text:
+            if ARABIC_LETTERS.search(self.text):
+                font, color = context.arabic_font, ARABIC_COLOR
+            else:
+                font, color = context.button_font, TEXT_COLOR
+            profiler.count("font_renders")
+            self.shaped = font.render(self.text, True, color)
+            self.shaped_text = self.text
+        return self.shaped
+        
+    def draw(self, surface):
+        pygame.draw.rect(surface, (255, 255, 255), self.rect, border_radius=8)
+        pygame.draw.rect(surface, self.border_color, self.rect, 2, border_radius=8)
+        
+        if self.text:
+            text_surf = self.text_surface()
+        else:
+            text_surf = render_text(context.button_font, self.placeholder, (150, 150, 150))
+        if self.centered:
+            text_rect = text_surf.get_rect(center=self.rect.center)
+        else:
+            text_rect = text_surf.get_rect(midleft=(self.rect.x + 12, self.rect.centery))
+        
+        # Keep long text and tall Arabic glyphs inside the box
+        previous_clip = surface.get_clip()
+        surface.set_clip(self.rect.inflate(-4, -4).clip(previous_clip))
+        blit(surface, text_surf, text_rect)
+        surface.set_clip(previous_clip)
+        
+    def check_hover(self, pos):
+        self.hovered = self.rect.collidepoint(pos)
+        
+    def handle_event(self, event):
+        # Returns True if the text changed
+        if event.type == pygame.TEXTINPUT:
+            self.text += event.text
+            return True
+        if event.type == pygame.KEYDOWN and self.text:
+            if event.key == pygame.K_BACKSPACE:
+                self.text = self.text[:-1]
+                return True
+            if event.key == pygame.K_ESCAPE:
+                self.text = ""
+                return True
+        return False
+
+# Virtualized grid of verb buttons for the verb selection screen.
+# Row positions are computed once; only rows inside the scroll area get a
+# VerbButton, and buttons that scroll out of view are recycled for new rows,
+# so per-event and per-frame work is O(visible rows) instead of O(len(verbs)).
+# show() narrows the grid to a subset of verbs, such as search matches.
+class VerbGrid:
+    def __init__(self, x, y, width, height, verbs, verb_indices=None, columns=2, top_offset=120,
+                 row_height=110, column_width=350, button_width=300, button_height=80):
+        self.area = pygame.Rect(x, y, width, height)
+        self.verbs = verbs
+        self.columns = columns
+        self.top_offset = top_offset
+        self.row_height = row_height
+        self.column_width = column_width
+        self.button_width = button_width
+        self.button_height = button_height
+        
+        self.buttons = {}  # grid position -> VerbButton, visible rows only
+        self.spare_buttons = []
+        self.show(verb_indices)
+        
+    def show(self, verb_indices):
+        # Lay the grid out for these verbs (None for the whole deck)
+        self.layout(verb_indices)
+        self.spare_buttons.extend(self.buttons.values())
+        self.buttons = {}
+        self.scroll_position = None
+        
+    def layout(self, verb_indices):
+        self.verb_indices = verb_indices
+        self.count = len(self.verbs) if verb_indices is None else len(verb_indices)
+        
+        # Content-space top and bottom of every row
+        row_count = (self.count + self.columns - 1) // self.columns
+        self.row_tops = range(self.top_offset, self.top_offset + row_count * self.row_height, self.row_height)
+        self.row_bottoms = range(self.top_offset + self.button_height,
+                                 self.top_offset + self.button_height + row_count * self.row_height, self.row_height)
+        
+    def refresh(self, verb_indices, changed):
+        # The deck was reloaded: keep the buttons on screen and rebind only
+        # those whose verb changed or moved to another grid position
+        self.layout(verb_indices)
+        for index, button in list(self.buttons.items()):
+            if index >= self.count:
+                self.spare_buttons.append(self.buttons.pop(index))
+            elif button.verb_index != self.verb_at(index) or button.verb_index in changed:
+                self.bind(button, index)
+        self.scroll_position = None
+        
+    def verb_at(self, index):
+        return index if self.verb_indices is None else self.verb_indices[index]
+        
+    def visible_rows(self, scroll_position):
+        # Rows overlapping the scroll area, as a half-open range
+        first_row = bisect.bisect_right(self.row_bottoms, scroll_position)
+        last_row = bisect.bisect_left(self.row_tops, scroll_position + self.area.height)
+        return first_row, last_row
+        
+    def update(self, scroll_position):
+        if scroll_position == self.scroll_position:
+            return
+        self.scroll_position = scroll_position
+        
+        first_row, last_row = self.visible_rows(scroll_position)
+        first_index = first_row * self.columns
+        last_index = min(last_row * self.columns, self.count)
+        
+        # Recycle buttons whose rows scrolled out of view
+        for index in list(self.buttons):
+            if index < first_index or index >= last_index:
+                self.spare_buttons.append(self.buttons.pop(index))
+        
+        for index in range(first_index, last_index):
+            button = self.buttons.get(index)
+            if button is None:
+                button = self.make_button(index)
+                self.buttons[index] = button
+            button.rect.y = self.area.y + self.row_tops[index // self.columns] - scroll_position
+            
+    def make_button(self, index):
+        if self.spare_buttons:
+            return self.bind(self.spare_buttons.pop(), index)
+        verb_index = self.verb_at(index)
+        verb = self.verbs.verb(verb_index)
+        x = self.area.x + 25 + (index % self.columns) * self.column_width
+        return VerbButton(x, 0, self.button_width, self.button_height, verb_index, verb.infinitive, verb.meaning)
+        
+    def bind(self, button, index):
+        # Point a recycled button at the verb in this grid position
+        verb_index = self.verb_at(index)
+        verb = self.verbs.verb(verb_index)
+        button.rect.x = self.area.x + 25 + (index % self.columns) * self.column_width
+        button.verb_index = verb_index
+        button.text = verb.infinitive
+        button.meaning = verb.meaning
+        button.hovered = False
+        button.selected = False
+        return button
+        
+    def visible_buttons(self):
+        return self.buttons.values()
+
 def draw_text_with_background(surface, text, font, color, x, y, bg_color=None):
-    text_surface = font.render(text, True, color)
+    text_surface = render_text(font, text, color)
     text_rect = text_surface.get_rect(center=(x, y))
     
     if bg_color:
@@ -259,56 +1676,196 @@ def draw_text_with_background(surface, text, font, color, x, y, bg_color=None):
         pygame.draw.rect(surface, bg_color, bg_rect, border_radius=5)
         pygame.draw.rect(surface, (180, 180, 180), bg_rect, 2, border_radius=5)
     
-    surface.blit(text_surface, text_rect)
+    blit(surface, text_surface, text_rect)
     return text_rect
 
+# Event-driven redraw: screens only repaint after input, a hover change or a
+# scroll change, and push just the dirty regions to the display.
+# Set to False to go back to unconditional 60 fps full-screen flips.
+EVENT_DRIVEN_REDRAW = True
+IDLE_WAIT_MS = 500  # How long an idle screen blocks waiting for an event
+PREFETCH_NEXT_QUESTION = True  # Shape the next practice question while the screen is idle
+
+# Window events after which the whole screen has to be repainted
+FULL_REDRAW_EVENTS = {
+    pygame.VIDEOEXPOSE,
+    pygame.WINDOWEXPOSED,
+    pygame.WINDOWSHOWN,
+    pygame.WINDOWRESTORED,
+    pygame.WINDOWSIZECHANGED,
+}
+
+class ScreenUpdater:
+    def __init__(self, surface, name):
+        self.surface = surface
+        self.name = name  # Screen name used in profiler traces
+        self.full = True  # First frame of a screen is always a full redraw
+        self.rects = []
+        self.idle_task = None  # Called instead of blocking; returns False once it has nothing left to do
+
+    def mark_full(self):
+        self.full = True
+
+    def mark(self, rect):
+        self.rects.append(pygame.Rect(rect))
+
+    def check_hover(self, widget, pos):
+        # Update a widget's hover state and mark it dirty if it changed
+        was_hovered = widget.hovered
+        widget.check_hover(pos)
+        if widget.hovered != was_hovered:
+            self.mark(widget.rect)
+
+    def pending(self):
+        return self.full or bool(self.rects)
+
+    def handle_event(self, event):
+        if event.type in FULL_REDRAW_EVENTS:
+            self.full = True
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            # Toggle the profiler overlay
+            profiler.overlay_visible = not profiler.overlay_visible
+            self.full = True
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+            # Save recent frames so a "the quiz lags" report comes with data.
+            # A read-only install directory must not take the app down with it
+            path = time.strftime("arabpython-trace-%Y%m%d-%H%M%S.csv")
+            try:
+                profiler.dump(path)
+                profiler.status = f"saved {path}"
+            except OSError as e:
+                print(f"Could not save trace {path}: {e}")
+                profiler.status = f"not saved: {e.strerror or e}"
+                profiler.overlay_visible = True
+            self.full = True
+
+    def get_events(self, timeout=IDLE_WAIT_MS):
+        profiler.end_frame()
+        
+        events = context.input.poll()
+        if EVENT_DRIVEN_REDRAW and not events and not self.pending():
+            # Nothing to draw - do a step of idle work and come straight back,
+            # or block until the next event or the timeout
+            if self.idle_task is None or not self.idle_task():
+                events = context.input.wait(timeout)
+        
+        profiler.start_frame(self.name, len(events))
+        return events
+
+    def flush(self, draw_scene):
+        # Returns True if anything was drawn this frame
+        if profiler.overlay_visible:
+            # Keep the overlay numbers current
+            self.mark(OVERLAY_RECT)
+        
+        if not EVENT_DRIVEN_REDRAW or self.full:
+            profiler.count("full_redraws")
+            draw_scene()
+            draw_profiler_overlay(self.surface)
+            pygame.display.flip()
+        elif self.rects:
+            # Repaint the whole scene clipped to the dirty area so overlapping
+            # widgets are redrawn correctly, then push only the dirty rects
+            dirty = self.rects[0].unionall(self.rects[1:])
+            self.surface.set_clip(dirty)
+            draw_scene()
+            draw_profiler_overlay(self.surface)
+            self.surface.set_clip(None)
+            pygame.display.update(self.rects)
+        else:
+            profiler.lap("draw")
+            return False
+
+        self.full = False
+        self.rects = []
+        profiler.count("redraws")
+        profiler.lap("draw")
+        return True
+
+OVERLAY_RECT = pygame.Rect(10, 10, 230, 173)
+
+def draw_profiler_overlay(surface):
+    if not profiler.overlay_visible:
+        return
+    frame = profiler.last_frame() or {}
+    lines = [
+        f"FPS: {profiler.fps()}",
+        f"frame: {frame.get('frame_ms', 0):.2f} ms",
+        f"events: {frame.get('events_ms', 0):.2f} ms",
+        f"draw: {frame.get('draw_ms', 0):.2f} ms",
+        f"font.render: {frame.get('font_renders', 0)}",
+        f"blits: {frame.get('blits', 0)}",
+    ]
+    if profiler.status:
+        lines.append(f"trace: {profiler.status}")
+    pygame.draw.rect(surface, (20, 20, 20), OVERLAY_RECT)
+    # Rendered directly rather than through text_cache: the numbers change
+    # every frame and would only churn the cache and the counters
+    for i, line in enumerate(lines):
+        surface.blit(context.debug_font.render(line, True, (120, 255, 120)), (OVERLAY_RECT.x + 8, OVERLAY_RECT.y + 6 + i * 23))
+
 def tense_selection_screen():
-    clock = pygame.time.Clock()
+    screen = context.screen
+    clock = context.input.clock()
     
     past_button = TenseButton(WIDTH//2 - 150, HEIGHT//2 - 50, 350, 80, "Прошедшее время", "past")
     present_button = TenseButton(WIDTH//2 - 150, HEIGHT//2 + 50, 350, 80, "Настоящее время", "present")
     
+    updater = ScreenUpdater(screen, "tense")
+    
+    def draw_scene():
+        screen.fill(BACKGROUND)
+        
+        # Draw title
+        title_text = render_text(context.title_font, "Выберите время глагола", TEXT_COLOR)
+        blit(screen, title_text, (WIDTH//2 - title_text.get_width()//2, 100))
+        
+        # Draw tense buttons
+        past_button.draw(screen)
+        present_button.draw(screen)
+    
     running = True
     while running:
-        mouse_pos = pygame.mouse.get_pos()
+        events = updater.get_events()
+        mouse_pos = context.input.mouse_pos()
         
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                shutdown()
+            
+            updater.handle_event(event)
                 
             if past_button.is_clicked(mouse_pos, event):
                 return "past"
             if present_button.is_clicked(mouse_pos, event):
                 return "present"
         
-        # Update button hover states
-        past_button.check_hover(mouse_pos)
-        present_button.check_hover(mouse_pos)
+        profiler.lap("events")
         
-        # Draw everything
-        screen.fill(BACKGROUND)
+        # Update button hover states
+        updater.check_hover(past_button, mouse_pos)
+        updater.check_hover(present_button, mouse_pos)
         
-        # Draw title
-        title_text = title_font.render("Выберите время глагола", True, TEXT_COLOR)
-        screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 100))
+        profiler.lap("layout")
         
-        # Draw tense buttons
-        past_button.draw(screen)
-        present_button.draw(screen)
-        
-        pygame.display.flip()
-        clock.tick(60)
+        # Draw only what changed
+        if updater.flush(draw_scene):
+            clock.tick(60)
 
 def verb_selection_screen(selected_tense):
-    clock = pygame.time.Clock()
+    screen = context.screen
+    verb_table = context.verb_table
+    search_index = context.search_index
+    clock = context.input.clock()
     
     # Create scrollable area dimensions
     scroll_area_x = 100
     scroll_area_y = 140
     scroll_area_width = WIDTH - 200
     scroll_area_height = HEIGHT - 250
-    scroll_content_height = max(scroll_area_height, (len(verbs_db) // 2 + 2) * 110)  # +2 for hard mode and spacing
+    shown_indices = verb_table.shown_indices()
+    shown_count = len(verb_table) if shown_indices is None else len(shown_indices)
+    scroll_content_height = max(scroll_area_height, (shown_count // 2 + 2) * 110)  # +2 for hard mode and spacing
     
     # Create scrollbar
     scrollbar = ScrollBar(
@@ -323,211 +1880,630 @@ def verb_selection_screen(selected_tense):
         330, 80, -1, "Сложный режим", "Все глаголы перемешаны", is_hard_mode=True
     )
     
-    # Create verb buttons
-    verb_buttons = []
-    for i, verb in enumerate(verbs_db):
-        row = i // 2
-        col = i % 2
-        x = scroll_area_x + 25 + col * 350
-        y = scroll_area_y + 120 + row * 110 - scrollbar.scroll_position  # Start below hard mode button
-        verb_buttons.append(VerbButton(x, y, 300, 80, i, verb["infinitive"], verb["meaning"]))
+    # Create verb grid (rows start below hard mode button)
+    scroll_area = pygame.Rect(scroll_area_x, scroll_area_y, scroll_area_width, scroll_area_height)
+    verb_grid = VerbGrid(scroll_area_x, scroll_area_y, scroll_area_width, scroll_area_height, verb_table, shown_indices)
+    verb_grid.update(scrollbar.scroll_position)
     
     # Create exit button (fixed position at bottom)
     exit_button = Button(WIDTH//2 - 150, HEIGHT - 80, 300, 60, "Выход в меню", EXIT_BUTTON_COLOR, EXIT_BUTTON_HOVER)
     
+    # Search box between the title and the list; typing filters the grid
+    search_box = TextField(scroll_area_x + 25, 88, scroll_area_width - 50, 44, "Поиск: глагол, корень или перевод")
+    shown_query = ""  # Query the grid currently shows the matches of
+    
+    updater = ScreenUpdater(screen, "verb")
+    
+    # Right-clicking a verb plays its infinitive; the clips of the verbs on
+    # screen are decoded in idle frames, before anyone clicks
+    sounds = context.sounds
+    prefetched_verbs = None
+    
+    def prefetch_visible():
+        nonlocal prefetched_verbs
+        visible = [button.verb_index for button in verb_grid.visible_buttons()]
+        if visible != prefetched_verbs:
+            prefetched_verbs = visible
+            sounds.prefetch(verb_table.infinitive_audio(verb_index) for verb_index in visible)
+        return False
+    
+    updater.idle_task = prefetch_visible
+    
+    def draw_scene():
+        screen.fill(BACKGROUND)
+        
+        # Draw title
+        title_text = render_text(context.title_font, f"Выберите глагол для практики", TEXT_COLOR)
+        blit(screen, title_text, (WIDTH//2 - title_text.get_width()//2, 30))
+        
+        search_box.draw(screen)
+        
+        # Create a surface for the scrollable area (optional - for visual clarity)
+        # pygame.draw.rect(screen, (250, 250, 250), (scroll_area_x, scroll_area_y, scroll_area_width, scroll_area_height), border_radius=10)
+        
+        # Draw buttons that are within the visible area
+        if hard_mode_button.rect.colliderect(scroll_area):
+            hard_mode_button.draw(screen)
+            
+        for button in verb_grid.visible_buttons():
+            button.draw(screen)
+        
+        # Draw scrollbar
+        scrollbar.draw(screen)
+        
+        # Draw exit button (always visible)
+        exit_button.draw(screen)
+    
     running = True
     selected_verb_index = None
     
     while running:
-        mouse_pos = pygame.mouse.get_pos()
+        events = updater.get_events()
+        mouse_pos = context.input.mouse_pos()
+        
+        previous_scroll = scrollbar.scroll_position
+        was_dragging = scrollbar.dragging
         
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                shutdown()
+            
+            updater.handle_event(event)
+            
+            if search_box.handle_event(event):
+                updater.mark(search_box.rect)
                 
             # Handle scrollbar events
             scroll_position = scrollbar.handle_event(event, mouse_pos)
             
             # Update button positions based on scroll
             hard_mode_button.rect.y = scroll_area_y + 10 - scroll_position
-            
-            for i, button in enumerate(verb_buttons):
-                row = i // 2
-                button.rect.y = scroll_area_y + 120 + row * 110 - scroll_position
+            verb_grid.update(scroll_position)
             
             # Check button clicks only if they're visible
-            if hard_mode_button.rect.colliderect(pygame.Rect(scroll_area_x, scroll_area_y, scroll_area_width, scroll_area_height)):
+            if hard_mode_button.rect.colliderect(scroll_area):
                 if hard_mode_button.is_clicked(mouse_pos, event):
                     selected_verb_index = -1
                     running = False
                     
-            for button in verb_buttons:
-                if button.rect.colliderect(pygame.Rect(scroll_area_x, scroll_area_y, scroll_area_width, scroll_area_height)):
-                    if button.is_clicked(mouse_pos, event):
-                        selected_verb_index = button.verb_index
-                        running = False
+            for button in verb_grid.visible_buttons():
+                if button.is_clicked(mouse_pos, event):
+                    selected_verb_index = button.verb_index
+                    running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3 and button.rect.collidepoint(mouse_pos):
+                    clip = verb_table.infinitive_audio(button.verb_index)
+                    if clip:
+                        sounds.play([clip])
                 
             if exit_button.is_clicked(mouse_pos, event):
                 return "exit"
         
-        # Update button hover states for visible buttons only
-        scrollbar.check_hover(mouse_pos)
-        exit_button.check_hover(mouse_pos)
+        profiler.lap("events")
         
-        if hard_mode_button.rect.colliderect(pygame.Rect(scroll_area_x, scroll_area_y, scroll_area_width, scroll_area_height)):
-            hard_mode_button.check_hover(mouse_pos)
-            
-        for button in verb_buttons:
-            if button.rect.colliderect(pygame.Rect(scroll_area_x, scroll_area_y, scroll_area_width, scroll_area_height)):
-                button.check_hover(mouse_pos)
+        # A deck file was edited: rebind the buttons of changed verbs and
+        # keep the scroll position; a filtered list is refreshed once the
+        # search index has been rebuilt
+        change = context.reload_decks()
+        if change:
+            search_index = context.search_index
+            # A query that normalizes to nothing ("-", a lone haraka) shows the whole deck
+            if shown_query and verb_grid.verb_indices is not None:
+                shown_query = None
+                matches = [verb_index for verb_index in verb_grid.verb_indices if verb_index not in change.removed]
+                verb_grid.refresh(matches, change.changed)
+            else:
+                verb_grid.refresh(verb_table.shown_indices(), change.changed)
+            scrollbar.content_height = max(scroll_area_height, (verb_grid.count // 2 + 2) * 110)
+            scrollbar.scroll_position = max(0, min(scrollbar.scroll_position, scrollbar.content_height - scroll_area_height))
+            scrollbar.update_handle()
+            hard_mode_button.rect.y = scroll_area_y + 10 - scrollbar.scroll_position
+            verb_grid.update(scrollbar.scroll_position)
+            updater.mark_full()
         
-        # Draw everything
-        screen.fill(BACKGROUND)
+        # Refilter when the query changed, once the index is built
+        if search_box.text != shown_query and search_index.ready.is_set():
+            shown_query = search_box.text
+            matches = search_index.search(shown_query)
+            verb_grid.show(verb_table.shown_indices() if matches is None else matches)
+            scrollbar.content_height = max(scroll_area_height, (verb_grid.count // 2 + 2) * 110)
+            scrollbar.scroll_position = 0
+            scrollbar.update_handle()
+            hard_mode_button.rect.y = scroll_area_y + 10
+            verb_grid.update(0)
+            updater.mark_full()
         
-        # Draw title
-        tense_name = "прошедшем" if selected_tense == "past" else "настоящем"
-        title_text = title_font.render(f"Выберите глагол для практики", True, TEXT_COLOR)
-        screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 50))
+        # Scrolling moves every button, so repaint the whole screen
+        if scrollbar.scroll_position != previous_scroll:
+            updater.mark_full()
+        if scrollbar.dragging != was_dragging:
+            updater.mark(scrollbar.rect)
         
-        # Create a surface for the scrollable area (optional - for visual clarity)
-        # pygame.draw.rect(screen, (250, 250, 250), (scroll_area_x, scroll_area_y, scroll_area_width, scroll_area_height), border_radius=10)
+        # Update button hover states for visible buttons only
+        updater.check_hover(scrollbar, mouse_pos)
+        updater.check_hover(exit_button, mouse_pos)
         
-        # Draw buttons that are within the visible area
-        if hard_mode_button.rect.colliderect(pygame.Rect(scroll_area_x, scroll_area_y, scroll_area_width, scroll_area_height)):
-            hard_mode_button.draw(screen)
+        if hard_mode_button.rect.colliderect(scroll_area):
+            updater.check_hover(hard_mode_button, mouse_pos)
             
-        for button in verb_buttons:
-            if button.rect.colliderect(pygame.Rect(scroll_area_x, scroll_area_y, scroll_area_width, scroll_area_height)):
-                button.draw(screen)
-        
-        # Draw scrollbar
-        scrollbar.draw(screen)
+        for button in verb_grid.visible_buttons():
+            updater.check_hover(button, mouse_pos)
         
-        # Draw exit button (always visible)
-        exit_button.draw(screen)
+        profiler.lap("layout")
         
-        pygame.display.flip()
-        clock.tick(60)
+        # Draw only what changed
+        if updater.flush(draw_scene):
+            clock.tick(60)
     
     return selected_verb_index
 
+def card_key(verb, tense, pronoun):
+    # Stable across deck edits and recompiles, unlike verb indices
+    return f"{verb.infinitive}|{verb.root or ''}|{tense}|{pronoun}"
+
+def practice_session(verb_table, tense_index, practice_verbs, progress=None):
+    # Cards already in the progress journal for this tense and these verbs
+    # (the app's own journal unless another learner's scheduler is given)
+    progress = context.progress if progress is None else progress
+    tense = TENSES[tense_index]
+    single_verb = practice_verbs[0] if len(practice_verbs) == 1 else None
+    known = []
+    for key in progress.cards:
+        infinitive, root, card_tense, pronoun = key.split("|")
+        if card_tense != tense:
+            continue
+        verb_index = verb_table.find(infinitive, root or None)
+        if verb_index is None or (single_verb is not None and verb_index != single_verb):
+            continue
+        verb_table.load(verb_index)
+        pronoun_index = verb_table.find_pronoun(pronoun)
+        if pronoun_index is not None and verb_table.conjugation(verb_index, tense_index, pronoun_index):
+            known.append((key, (verb_index, pronoun_index)))
+    
+    def new_cards():
+        # Every (verb, pronoun slot) of the practice set in shuffled order;
+        # slots the verb has no form for are skipped. The pronoun table grows
+        # as verbs load, so after each pass the slots that appeared during it
+        # get a pass of their own over every verb.
+        verb_table.load(practice_verbs[0])
+        first_slot, slots = 0, max(verb_table.stride, 1)
+        while first_slot < slots:
+            width = slots - first_slot
+            for card in scheduler.LazyShuffle(len(practice_verbs) * width):
+                verb_index = practice_verbs[card // width]
+                pronoun_index = first_slot + card % width
+                if verb_table.conjugation(verb_index, tense_index, pronoun_index) is None:
+                    continue
+                pronoun = verb_table.pronouns[pronoun_index][0]
+                yield card_key(verb_table.verb(verb_index), tense, pronoun), (verb_index, pronoun_index)
+            first_slot, slots = slots, max(verb_table.stride, slots)
+    
+    return scheduler.PracticeSession(progress, known, new_cards())
+
+# Typed-answer feedback: border and label color, and label text
+ANSWER_COLORS = {
+    answers.EMPTY: (30, 30, 30),
+    answers.TYPING: BUTTON_COLOR,
+    answers.WRONG: EXIT_BUTTON_COLOR,
+    answers.SKELETON: (200, 140, 40),
+    answers.EXACT: CORRECT_COLOR,
+}
+
+def answer_feedback(status, position):
+    if status == answers.WRONG:
+        return f"Ошибка: буква {position + 1}"
+    if status == answers.SKELETON:
+        return f"Огласовка: буква {position + 1}"
+    if status == answers.EXACT:
+        return "Верно!"
+    return "Ваш ответ:"
+
+def choice_options(verb_table, verb_index, tense_index, pronoun_index, count=4):
+    # The right form plus believable wrong ones, in random order: the same
+    # pronoun of similar verbs alternating with other pronouns of this verb
+    correct = verb_table.conjugation(verb_index, tense_index, pronoun_index)
+    same_verb = [verb_table.conjugation(verb_index, tense_index, other)
+                 for other in verb_table.pronoun_indices(verb_index, tense_index) if other != pronoun_index]
+    random.shuffle(same_verb)
+    similar = []
+    distractor_index = context.distractor_index
+    if distractor_index.ready.is_set():
+        similar = [verb_table.conjugation(other, tense_index, pronoun_index)
+                   for other in distractor_index.neighbors(verb_index, count)]
+    
+    options = [correct]
+    skeletons = {verb_table.form_key(correct).skeleton}
+    for form in itertools.chain.from_iterable(itertools.zip_longest(similar, same_verb)):
+        if len(options) == count:
+            break
+        # Options must look different even without harakat
+        if form is None or verb_table.form_key(form).skeleton in skeletons:
+            continue
+        skeletons.add(verb_table.form_key(form).skeleton)
+        options.append(form)
+    random.shuffle(options)
+    return options
+
 def practice_screen(selected_tense, selected_verb_index):
+    screen = context.screen
+    verb_table = context.verb_table
+    
     # Prepare the verb list based on selection
     if selected_verb_index == -1:  # Hard mode - all verbs
-        practice_verbs = verbs_db
+        practice_verbs = range(len(verb_table))
     else:  # Single verb selected
-        practice_verbs = [verbs_db[selected_verb_index]]
+        practice_verbs = [selected_verb_index]
+    tense_index = TENSES.index(selected_tense)
     
     # Get the tense name for display
     tense_name = "прошедшем" if selected_tense == "past" else "настоящем"
     
-    clock = pygame.time.Clock()
+    clock = context.input.clock()
     action_button = Button(WIDTH//2 - 150, HEIGHT - 80, 300, 60, "Показать ответ")
+    forgot_button = Button(WIDTH//2 + 170, HEIGHT - 80, 200, 60, "Не знал", EXIT_BUTTON_COLOR, EXIT_BUTTON_HOVER)
     exit_button = Button(WIDTH//2 - 150, HEIGHT - 150, 300, 60, "Выход в меню", EXIT_BUTTON_COLOR, EXIT_BUTTON_HOVER)
     
-    # Initialize quiz with a random verb and pronoun
-    current_verb = random.choice(practice_verbs)
-    current_pronoun = random.choice(current_verb[selected_tense])
+    # Optional typed answer, checked on every keystroke
+    answer_field = TextField(WIDTH//2 - 150, 395, 300, 48, "Напечатайте ответ", centered=True)
+    feedback_rect = pygame.Rect(0, answer_field.rect.y, answer_field.rect.x, answer_field.rect.height)
+    answer_status, mismatch = answers.EMPTY, None
+    graded = False  # A typed answer grades the card when it is shown
+    
+    # Multiple-choice mode replaces the answer field with four options
+    choice_mode = False
+    mode_button = Button(WIDTH - 190, 20, 170, 44, "Варианты")
+    choice_buttons = [ChoiceButton(WIDTH//2 - 305 + column * 310, 395 + row * 52, 300, 46)
+                      for row in range(2) for column in range(2)]
+    
+    def show_choices(options=None):
+        if options is None:
+            options = choice_options(verb_table, current_verb, tense_index, current_pronoun, len(choice_buttons))
+        for button, option in zip(choice_buttons, options + [None] * len(choice_buttons)):
+            button.text = option
+            button.result_color = None
+    
+    # Pronunciation of the pronoun, and of the form once the answer is shown
+    sounds = context.sounds
+    listen_button = Button(WIDTH - 190, 72, 170, 44, "Слушать")
+    
+    def question_audio(verb_index, pronoun_index, with_form=True):
+        pronoun_clip, form_clip = verb_table.form_audio(verb_index, tense_index, pronoun_index)
+        return [clip for clip in (pronoun_clip, form_clip if with_form else None) if clip]
+    
+    def mark_choices():
+        # Color the right option once the answer is shown
+        correct = verb_table.conjugation(current_verb, tense_index, current_pronoun)
+        for button in choice_buttons:
+            if button.text == correct:
+                button.result_color = CORRECT_COLOR
+    
+    # Questions come from the spaced-repetition scheduler: due cards first,
+    # then cards never asked before
+    session = practice_session(verb_table, tense_index, practice_verbs)
+    
+    def next_card(skip=None):
+        # Cards whose form was edited out of the deck are dropped on the way
+        while True:
+            card = session.next(skip=skip)
+            if card is None or verb_table.conjugation(card[1][0], tense_index, card[1][1]) is not None:
+                return card
+            session.drop(card[0])
+    
+    card = next_card()
+    if card is None:
+        return True  # Every chosen verb lacks forms for this tense
+    current_key, (current_verb, current_pronoun) = card
     show_answer = False
     
-    running = True
-    while running:
-        mouse_pos = pygame.mouse.get_pos()
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-                
-            if action_button.is_clicked(mouse_pos, event):
-                if show_answer:
-                    # If answer is showing, go to next question
-                    current_verb = random.choice(practice_verbs)
-                    current_pronoun = random.choice(current_verb[selected_tense])
-                    show_answer = False
-                    action_button.text = "Показать ответ"
-                else:
-                    # If answer is not showing, show it
-                    show_answer = True
-                    action_button.text = "Следующий вопрос"
-                    
-            if exit_button.is_clicked(mouse_pos, event):
-                return True  # Return to main menu
-        
-        # Update button hover state
-        action_button.check_hover(mouse_pos)
-        exit_button.check_hover(mouse_pos)
-        
-        # Draw everything
+    # Every question, reveal and answer is queued to the session log; the
+    # time since the question was shown separates hesitation from recall
+    session_log = context.session_log
+    shown_at = 0.0
+    
+    def log_event(kind, mode=None, correct=None, answer=None):
+        nonlocal shown_at
+        now = time.time()
+        if kind == sessionlog.SHOWN:
+            shown_at = now
+            mode = "choice" if choice_mode else "recall"
+        session_log.log(kind, current_key, mode, correct, answer, round(now - shown_at, 3))
+    
+    log_event(sessionlog.SHOWN)
+    
+    # The likely next question is picked while the learner thinks about this
+    # one, and its text is shaped into the render cache in idle frames, so
+    # "next" draws from surfaces that are already there. The clips of both
+    # questions are handed to the audio thread at the same time.
+    prefetched = None  # (key, (verb, pronoun), choice options), or False if there is none
+    prefetch_texts = []  # (font, text, color) still to shape
+    
+    def question_texts(verb_index, pronoun_index, options):
+        # Every string draw_scene renders for a question, with its answer shown
+        pronoun, pronoun_meaning = verb_table.pronouns[pronoun_index]
+        texts = [(context.arabic_font, pronoun, ARABIC_COLOR),
+                 (context.arabic_font, verb_table.conjugation(verb_index, tense_index, pronoun_index), ARABIC_COLOR)]
+        if selected_verb_index == -1:
+            verb = verb_table.verb(verb_index)
+            texts.append((context.arabic_font, verb.infinitive, ARABIC_COLOR))
+            texts.append((context.meaning_font, f"({verb.meaning})", (100, 100, 100)))
+        if pronoun_meaning:
+            texts.append((context.meaning_font, pronoun_meaning, (80, 80, 80)))
+        texts.extend((context.arabic_font, option, ARABIC_COLOR) for option in options)
+        return texts
+    
+    def prefetch_step():
+        # One step of idle work per call; False once everything is shaped
+        nonlocal prefetched, prefetch_texts
+        if not PREFETCH_NEXT_QUESTION:
+            return False
+        if prefetched is None:
+            sounds.prefetch(question_audio(current_verb, current_pronoun))
+            card = next_card(skip=current_key)
+            if card is None:
+                prefetched = False
+                return False
+            key, (verb_index, pronoun_index) = card
+            sounds.prefetch(question_audio(verb_index, pronoun_index))
+            options = []
+            if choice_mode:
+                options = choice_options(verb_table, verb_index, tense_index, pronoun_index, len(choice_buttons))
+            prefetched = (key, (verb_index, pronoun_index), options)
+            prefetch_texts = question_texts(verb_index, pronoun_index, options)
+            return True
+        if prefetch_texts:
+            render_text(*prefetch_texts.pop())
+            return True
+        return False
+    
+    updater = ScreenUpdater(screen, "practice")
+    updater.idle_task = prefetch_step
+    
+    def answer_area():
+        # Screen region covered by the answer label and the answer box
+        answer_label = render_text(context.answer_font, "Ответ:", TEXT_COLOR)
+        label_rect = answer_label.get_rect(topleft=(WIDTH//2 - 180, 355))
+        conjugation = verb_table.conjugation(current_verb, tense_index, current_pronoun)
+        conjugation_surface = render_text(context.arabic_font, conjugation, ARABIC_COLOR)
+        box_rect = conjugation_surface.get_rect(center=(WIDTH//2, 365)).inflate(20, 10)
+        return label_rect.union(box_rect)
+    
+    def draw_scene():
         screen.fill(BACKGROUND)
         
         # Draw title
-        title_text = title_font.render(f"Арабский квиз", True, TEXT_COLOR)
-        screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 30))
+        title_text = render_text(context.title_font, f"Арабский квиз", TEXT_COLOR)
+        blit(screen, title_text, (WIDTH//2 - title_text.get_width()//2, 30))
         
         # Draw current verb info (only in hard mode) 
         if selected_verb_index == -1:
             # Create the verb info text components
             verb_part1 = "Глагол: "
-            verb_infinitive = current_verb['infinitive']
-            verb_part2 = f"({current_verb['meaning']})"
+            verb = verb_table.verb(current_verb)
+            verb_infinitive = verb.infinitive
+            verb_part2 = f"({verb.meaning})"
             
             # Render each part with the appropriate font
-            part1_surface = meaning_font.render(verb_part1, True, (100, 100, 100))
-            infinitive_surface = arabic_font.render(verb_infinitive, True, ARABIC_COLOR)
-            part2_surface = meaning_font.render(verb_part2, True, (100, 100, 100))
+            part1_surface = render_text(context.meaning_font, verb_part1, (100, 100, 100))
+            infinitive_surface = render_text(context.arabic_font, verb_infinitive, ARABIC_COLOR)
+            part2_surface = render_text(context.meaning_font, verb_part2, (100, 100, 100))
             
             # Calculate total width and starting position
             total_width = part1_surface.get_width() + infinitive_surface.get_width() + part2_surface.get_width() + 10
             start_x = (WIDTH - total_width) // 2
             
             # Draw all parts at the correct y-position 
-            screen.blit(part1_surface, (start_x, 110)) 
-            screen.blit(infinitive_surface, (start_x + part1_surface.get_width() + 5, 90)) 
-            screen.blit(part2_surface, (start_x + part1_surface.get_width() + infinitive_surface.get_width() + 10, 110)) 
+            blit(screen, part1_surface, (start_x, 110)) 
+            blit(screen, infinitive_surface, (start_x + part1_surface.get_width() + 5, 90)) 
+            blit(screen, part2_surface, (start_x + part1_surface.get_width() + infinitive_surface.get_width() + 10, 110)) 
         
         # Draw question
-        question_text = question_font.render(f"Какой будет форма в {tense_name} времени для:", True, TEXT_COLOR)
-        screen.blit(question_text, (WIDTH//2 - question_text.get_width()//2, 165)) 
+        question_text = render_text(context.question_font, f"Какой будет форма в {tense_name} времени для:", TEXT_COLOR)
+        blit(screen, question_text, (WIDTH//2 - question_text.get_width()//2, 165)) 
+        
+        pronoun, pronoun_meaning = verb_table.pronouns[current_pronoun]
         
         # Draw pronoun with background 
         pronoun_rect = draw_text_with_background(
-            screen, current_pronoun['pronoun'], arabic_font, 
+            screen, pronoun, context.arabic_font, 
             ARABIC_COLOR, WIDTH//2, 250, HIGHLIGHT_COLOR
         )
         
         # Draw meaning of the pronoun 
-        pronoun_meaning = current_pronoun.get('meaning', '')
         if pronoun_meaning:
-            meaning_text = meaning_font.render(pronoun_meaning, True, (80, 80, 80))
-            screen.blit(meaning_text, (WIDTH//2 - meaning_text.get_width()//2, 310)) 
+            meaning_text = render_text(context.meaning_font, pronoun_meaning, (80, 80, 80))
+            blit(screen, meaning_text, (WIDTH//2 - meaning_text.get_width()//2, 310)) 
         
         # Draw answer if shown 
         if show_answer:
             # Draw answer label aligned with the answer window
-            answer_label = answer_font.render("Ответ:", True, TEXT_COLOR)
-            screen.blit(answer_label, (WIDTH//2 - 180, 355))
+            answer_label = render_text(context.answer_font, "Ответ:", TEXT_COLOR)
+            blit(screen, answer_label, (WIDTH//2 - 180, 355))
             
             # Draw Arabic conjugation with background
             conjugation_rect = draw_text_with_background(
-                screen, current_pronoun['conjugation'], arabic_font, 
+                screen, verb_table.conjugation(current_verb, tense_index, current_pronoun), context.arabic_font, 
                 ARABIC_COLOR, WIDTH//2, 365, HIGHLIGHT_COLOR  
             )
         
+        if choice_mode:
+            for button in choice_buttons:
+                if button.text:
+                    button.draw(screen)
+        else:
+            # Draw the typed answer and how it compares so far
+            answer_field.draw(screen)
+            feedback = render_text(context.answer_font, answer_feedback(answer_status, mismatch), ANSWER_COLORS[answer_status])
+            blit(screen, feedback, (answer_field.rect.x - 10 - feedback.get_width(),
+                                    answer_field.rect.centery - feedback.get_height()//2))
+        
         # Draw buttons
         action_button.draw(screen)
         exit_button.draw(screen)
+        mode_button.draw(screen)
+        if question_audio(current_verb, current_pronoun, show_answer):
+            listen_button.draw(screen)
+        if show_answer and not graded:
+            forgot_button.draw(screen)
         
         # Draw instructions
-        instructions = answer_font.render("Подумайте над ответом, затем нажмите кнопку для проверки", True, (100, 100, 100))
-        screen.blit(instructions, (WIDTH//2 - instructions.get_width()//2, HEIGHT - 200))
+        if not choice_mode:
+            instructions = render_text(context.answer_font, "Напечатайте ответ и нажмите Enter или кнопку для проверки", (100, 100, 100))
+            blit(screen, instructions, (WIDTH//2 - instructions.get_width()//2, HEIGHT - 200))
+    
+    running = True
+    while running:
+        events = updater.get_events()
+        mouse_pos = context.input.mouse_pos()
+        
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+            
+            updater.handle_event(event)
+                
+            if mode_button.is_clicked(mouse_pos, event):
+                choice_mode = not choice_mode
+                mode_button.text = "Ввод ответа" if choice_mode else "Варианты"
+                prefetched = None  # Shape choice options for the next question too
+                if choice_mode:
+                    show_choices()
+                    if show_answer:
+                        mark_choices()
+                    elif answer_field.text:
+                        answer_field.text = ""
+                        answer_status, mismatch = answers.EMPTY, None
+                        answer_field.border_color = ANSWER_COLORS[answer_status]
+                updater.mark_full()
+                
+            clips = question_audio(current_verb, current_pronoun, show_answer)
+            if clips and listen_button.is_clicked(mouse_pos, event):
+                sounds.play(clips)
+                
+            chosen = None
+            if choice_mode and not show_answer:
+                chosen = next((button for button in choice_buttons
+                               if button.text and button.is_clicked(mouse_pos, event)), None)
+            if chosen:
+                # Picking an option shows and grades the answer
+                correct = chosen.text == verb_table.conjugation(current_verb, tense_index, current_pronoun)
+                session.review(current_key, correct)
+                log_event(sessionlog.ANSWER, "choice", correct, chosen.text)
+                show_answer = True
+                graded = True
+                mark_choices()
+                if not correct:
+                    chosen.result_color = EXIT_BUTTON_COLOR
+                action_button.text = "Следующий вопрос"
+                updater.mark_full()
+                
+            enter = event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_KP_ENTER)
+            forgot = show_answer and not graded and forgot_button.is_clicked(mouse_pos, event)
+            if action_button.is_clicked(mouse_pos, event) or forgot or (enter and (show_answer or answer_field.text)):
+                if show_answer:
+                    # If answer is showing, grade the card (unless the typed
+                    # answer already did) and go to next question
+                    if not graded:
+                        session.review(current_key, not forgot)
+                        log_event(sessionlog.ANSWER, "recall", not forgot)
+                    card = next_card()
+                    if card is None:
+                        session_log.flush()
+                        return True  # Every card was edited out of the deck
+                    current_key, (current_verb, current_pronoun) = card
+                    log_event(sessionlog.SHOWN)
+                    ready = prefetched and prefetched[0] == current_key
+                    show_answer = False
+                    graded = False
+                    answer_field.text = ""
+                    answer_status, mismatch = answers.EMPTY, None
+                    answer_field.border_color = ANSWER_COLORS[answer_status]
+                    action_button.text = "Показать ответ"
+                    if choice_mode:
+                        show_choices(prefetched[2] if ready and prefetched[2] else None)
+                    prefetched = None
+                    prefetch_texts = []
+                    updater.mark_full()
+                else:
+                    # If answer is not showing, show it; a typed answer is graded right away
+                    show_answer = True
+                    if answer_field.text:
+                        correct = answer_status in (answers.EXACT, answers.SKELETON)
+                        session.review(current_key, correct)
+                        log_event(sessionlog.ANSWER, "typed", correct, answer_field.text)
+                        graded = True
+                        action_button.text = "Следующий вопрос"
+                    else:
+                        log_event(sessionlog.REVEAL)
+                        action_button.text = "Знал, дальше"
+                        updater.mark(forgot_button.rect)
+                    updater.mark(answer_area())
+                    updater.mark(action_button.rect)
+                    updater.mark(listen_button.rect)  # Appears when only the form has a clip
+                    if choice_mode:
+                        mark_choices()
+                        updater.mark_full()
+            elif not choice_mode and not show_answer and answer_field.handle_event(event):
+                expected = verb_table.answer_key(current_verb, tense_index, current_pronoun)
+                answer_status, mismatch = answers.check(expected, answer_field.text)
+                answer_field.border_color = ANSWER_COLORS[answer_status]
+                updater.mark(answer_field.rect)
+                updater.mark(feedback_rect)
+                    
+            if exit_button.is_clicked(mouse_pos, event):
+                session_log.flush()
+                return True  # Return to main menu
+        
+        profiler.lap("events")
         
-        pygame.display.flip()
-        clock.tick(60)
+        # A deck file was edited: stay on this question unless its form is gone
+        change = context.reload_decks()
+        if change:
+            prefetched = None
+            prefetch_texts = []
+            moved = verb_table.conjugation(current_verb, tense_index, current_pronoun) is None
+            if moved:
+                session.drop(current_key)
+                card = next_card()
+                if card is None:
+                    session_log.flush()
+                    return True  # Nothing left to practice
+                current_key, (current_verb, current_pronoun) = card
+                log_event(sessionlog.SHOWN)
+                show_answer = False
+                graded = False
+                answer_field.text = ""
+                action_button.text = "Показать ответ"
+            if moved or current_verb in change.changed:
+                if choice_mode:
+                    show_choices()
+                    if show_answer:
+                        mark_choices()
+                if not show_answer:
+                    expected = verb_table.answer_key(current_verb, tense_index, current_pronoun)
+                    answer_status, mismatch = answers.check(expected, answer_field.text)
+                    answer_field.border_color = ANSWER_COLORS[answer_status]
+            updater.mark_full()
+        
+        # Update button hover state
+        updater.check_hover(action_button, mouse_pos)
+        updater.check_hover(exit_button, mouse_pos)
+        updater.check_hover(mode_button, mouse_pos)
+        if question_audio(current_verb, current_pronoun, show_answer):
+            updater.check_hover(listen_button, mouse_pos)
+        if show_answer and not graded:
+            updater.check_hover(forgot_button, mouse_pos)
+        if choice_mode:
+            for button in choice_buttons:
+                updater.check_hover(button, mouse_pos)
+        
+        profiler.lap("layout")
+        
+        # Draw only what changed
+        if updater.flush(draw_scene):
+            clock.tick(60)
     
     return False  # Return whether to continue running
 
-def main():
+def run_session():
     running = True
     while running:
         # Step 1: Tense selection
@@ -541,9 +2517,43 @@ def main():
         
         # Step 3: Practice
         running = practice_screen(selected_tense, selected_verb_index)
-    
+
+def shutdown():
+    # Every way out of the app ends here: the journal, the session log and the
+    # audio worker are closed before pygame.quit() takes the mixer away. Only
+    # what the session actually opened is closed
+    for name in ("progress", "session_log", "sounds"):
+        if name in vars(context):
+            getattr(context, name).close()
     pygame.quit()
     sys.exit()
 
+def main():
+    context.start()
+    context.watch_decks()
+    run_session()
+    shutdown()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = sys.argv[1:]
+    if args[:1] == ["--compile"]:
+        # python arabpython_v5.py --compile [verbs.json] [verbs.bin]
+        compile_verbs(*args[1:3])
+        sys.exit()
+    
+    # python arabpython_v5.py [--decks DIR] [--audio DIR] [--record session.json] [--trace trace.csv]
+    if "--decks" in args:
+        context.decks_dir = args[args.index("--decks") + 1]
+    if "--audio" in args:
+        context.audio_dir = args[args.index("--audio") + 1]
+    if "--record" in args:
+        context.input = RecordingInput(args[args.index("--record") + 1])
+    if "--trace" in args:
+        profiler.keep_all_frames()
+    try:
+        main()
+    finally:
+        if "--record" in args:
+            context.input.save()
+        if "--trace" in args:
+            profiler.dump(args[args.index("--trace") + 1])
@@ -0,0 +1,145 @@
+# Pronunciation clips for the practice and verb screens.
+#
+# A deck names the audio file of a verb's infinitive ("audio" on the verb)
+# and of each form ("audio" on a pronoun row, "pronoun_audio" for the
+# pronoun itself), relative to the audio folder. Decoding a clip when it is
+# clicked stalls the frame, and keeping every clip decoded would take
+# gigabytes, so decoded sounds are kept in an LRU cache with a byte budget,
+# and the clips the learner is likely to ask for next are decoded ahead of
+# time on a worker thread. pygame.mixer decodes under the dummy audio
+# driver too (SDL_AUDIODRIVER=dummy), so all of this runs headless; without
+# any mixer the screens simply have nothing to play.
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+import pygame
+
+AUDIO_DIR = "audio"
+CACHE_BYTES = 64 * 1024 * 1024  # About 6 minutes of 44.1 kHz 16-bit stereo
+PREFETCH_QUEUE_SIZE = 64  # Clips waiting for the worker; more are dropped
+
+class SoundCache:
+    def __init__(self, audio_dir=AUDIO_DIR, max_bytes=CACHE_BYTES):
+        self.audio_dir = audio_dir
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # clip name -> pygame.mixer.Sound, least recently used first
+        self.sizes = {}
+        self.total_bytes = 0
+        self.lock = threading.Lock()  # The worker inserts too
+        self.failed = set()  # Clips that could not be loaded, so they are not retried on every click
+        self.queue = queue.Queue(PREFETCH_QUEUE_SIZE)
+        self.thread = None
+        self.channel = None  # Where the last clip plays, so a new click cuts it off
+        self.no_mixer = False  # pygame.mixer.init() failed once; it is slow, so it is not retried
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefetched = 0
+
+    def available(self):
+        if pygame.mixer.get_init() is None:
+            if self.no_mixer:
+                return False
+            try:
+                pygame.mixer.init()
+            except pygame.error as e:
+                print(f"No audio: {e}")
+                self.no_mixer = True
+                return False
+        return True
+
+    def sound_bytes(self, sound):
+        # Decoded size in the mixer's own format; get_raw() would copy the samples
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency) * channels * (abs(sample_format) // 8)
+
+    def decode(self, name):
+        try:
+            return pygame.mixer.Sound(os.path.join(self.audio_dir, name))
+        except (pygame.error, OSError) as e:
+            if name not in self.failed:
+                print(f"Could not load audio {name}: {e}")
+            self.failed.add(name)
+            return None
+
+    def insert(self, name, sound):
+        size = self.sound_bytes(sound)
+        with self.lock:
+            if name in self.entries:
+                return self.entries[name]
+            self.entries[name] = sound
+            self.sizes[name] = size
+            self.total_bytes += size
+            # Evict least recently used clips until we are back within budget
+            while len(self.entries) > 1 and self.total_bytes > self.max_bytes:
+                old, _ = self.entries.popitem(last=False)
+                self.total_bytes -= self.sizes.pop(old)
+                self.evictions += 1
+        return sound
+
+    def load(self, name):
+        with self.lock:
+            sound = self.entries.get(name)
+            if sound is not None:
+                self.entries.move_to_end(name)
+                self.hits += 1
+                return sound
+        if name in self.failed or not self.available():
+            return None
+        self.misses += 1
+        sound = self.decode(name)
+        return sound and self.insert(name, sound)
+
+    def play(self, names):
+        # The pronoun, then the form: the channel holds one queued clip
+        sounds = [sound for sound in map(self.load, names) if sound is not None]
+        if self.channel is not None:
+            self.channel.stop()
+        self.channel = sounds[0].play() if sounds else None
+        if self.channel is not None and len(sounds) > 1:
+            self.channel.queue(sounds[1])
+
+    def prefetch(self, names):
+        # Decode these clips on the worker thread unless they are cached already
+        for name in names:
+            if not name or name in self.entries or name in self.failed:
+                continue
+            if self.thread is None:
+                if not self.available():
+                    return
+                self.thread = threading.Thread(target=self.run, name="audio-prefetch", daemon=True)
+                self.thread.start()
+            try:
+                self.queue.put_nowait(name)
+            except queue.Full:
+                return
+
+    def close(self):
+        # Stop the worker before pygame.quit() takes the mixer away
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(1.0)
+
+    def run(self):
+        while True:
+            name = self.queue.get()
+            if name is None:
+                break
+            if name in self.entries or name in self.failed:
+                continue
+            sound = self.decode(name)
+            if sound is not None:
+                self.insert(name, sound)
+                self.prefetched += 1
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "prefetched": self.prefetched,
+            "items": len(self.entries),
+            "bytes": self.total_bytes,
+        }
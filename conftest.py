@@ -0,0 +1,23 @@
+import sys
+
+import pytest
+
+@pytest.fixture(autouse=True)
+def restore_deck():
+    # Tests that swap the deck with benchmark.use_deck give app.context back
+    # as they found it, with the session log they opened closed
+    app = sys.modules.get("arabpython_v5")
+    if app is None:
+        yield
+        return
+    from benchmark import DECK_FIELDS
+    saved = {name: vars(app.context)[name] for name in DECK_FIELDS if name in vars(app.context)}
+    yield
+    session_log = vars(app.context).get("session_log")
+    if session_log is not None and session_log is not saved.get("session_log"):
+        session_log.close()
+    for name in DECK_FIELDS:
+        if name in saved:
+            setattr(app.context, name, saved[name])
+        else:
+            vars(app.context).pop(name, None)
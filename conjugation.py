@@ -0,0 +1,237 @@
+# Rule-based conjugation of regular (sound triliteral, Form I) verbs.
+#
+# A deck entry can give a "pattern" instead of full "past"/"present" tables:
+#
+#   {"infinitive": "كَتَبَ", "meaning": "писать", "root": "ك-ت-ب", "pattern": "a-u",
+#    "exceptions": {"present": {"أنا": "..."}}}
+#
+# The pattern is the stem vowel of the past tense and of the present tense
+# (كَتَبَ / يَكْتُبُ is "a-u", شَرِبَ / يَشْرَبُ is "i-a"). Only forms that differ
+# from the rules are stored under "exceptions"; weak, doubled and hamzated
+# roots keep their full tables.
+#
+#   python conjugation.py verify verbs.json              # diff rules against stored tables
+#   python conjugation.py compact verbs.json small.json  # store patterns + exceptions only
+#   python conjugation.py expand small.json verbs.json   # write full tables back out
+import sys
+import json
+from functools import lru_cache
+
+TENSES = ("past", "present")
+
+FATHA = "\u064e"
+DAMMA = "\u064f"
+KASRA = "\u0650"
+SUKUN = "\u0652"
+SHADDA = "\u0651"
+VOWELS = {"a": FATHA, "u": DAMMA, "i": KASRA}
+
+PATTERNS = ("a-u", "a-i", "a-a", "i-a", "i-i", "u-u")
+
+# Letters that make a root weak or hamzated, so the simple rules do not apply
+WEAK_LETTERS = set("اويىءأإؤئآ")
+
+# Pronouns in deck order, with their Russian meaning
+STANDARD_PRONOUNS = [
+    ("أنا", "я"),
+    ("انتَ", "ты (м.р.)"),
+    ("انتِ", "ты (ж.р.)"),
+    ("هو", "он"),
+    ("هي", "она"),
+    ("نحن", "мы"),
+    ("انتم", "вы (м.р.)"),
+    ("انتن", "вы (ж.р.)"),
+    ("هم", "они (м.р.)"),
+    ("هن", "они (ж.р.)"),
+]
+
+# Past tense: ending written after the third radical
+PAST_ENDINGS = {
+    "أنا": SUKUN + "ت" + DAMMA,
+    "انتَ": SUKUN + "ت" + FATHA,
+    "انتِ": SUKUN + "ت" + KASRA,
+    "هو": FATHA,
+    "هي": FATHA + "ت" + SUKUN,
+    "نحن": SUKUN + "ن" + FATHA + "ا",
+    "انتم": SUKUN + "ت" + DAMMA + "م" + SUKUN,
+    "انتن": SUKUN + "ت" + DAMMA + "ن" + SHADDA + FATHA,
+    "هم": DAMMA + "وا",
+    "هن": SUKUN + "ن" + FATHA,
+}
+
+# Present tense (indicative): prefix before the first radical, ending after the third
+PRESENT_AFFIXES = {
+    "أنا": ("أ" + FATHA, DAMMA),
+    "انتَ": ("ت" + FATHA, DAMMA),
+    "انتِ": ("ت" + FATHA, KASRA + "ين" + FATHA),
+    "هو": ("ي" + FATHA, DAMMA),
+    "هي": ("ت" + FATHA, DAMMA),
+    "نحن": ("ن" + FATHA, DAMMA),
+    "انتم": ("ت" + FATHA, DAMMA + "ون" + FATHA),
+    "انتن": ("ت" + FATHA, SUKUN + "ن" + FATHA),
+    "هم": ("ي" + FATHA, DAMMA + "ون" + FATHA),
+    "هن": ("ي" + FATHA, SUKUN + "ن" + FATHA),
+}
+
+def split_root(root):
+    radicals = tuple(letter.strip() for letter in root.split("-"))
+    if len(radicals) != 3 or not all(len(letter) == 1 for letter in radicals):
+        raise ValueError(f"Root {root!r} is not a triliteral root")
+    if WEAK_LETTERS.intersection(radicals) or radicals[1] == radicals[2]:
+        raise ValueError(f"Root {root!r} is weak, hamzated or doubled; store its forms in the deck")
+    return radicals
+
+def is_regular_root(root):
+    try:
+        split_root(root)
+    except ValueError:
+        return False
+    return True
+
+def compact_error(verb):
+    # Why the rules cannot generate a compact entry's tables, or None
+    if not isinstance(verb.get("root"), str):
+        return "a compact entry needs a root"
+    if not isinstance(verb.get("pattern"), str) or verb["pattern"] not in PATTERNS:
+        return f"unknown pattern {verb.get('pattern')!r}, expected one of {', '.join(PATTERNS)}"
+    try:
+        split_root(verb["root"])
+    except ValueError as e:
+        return str(e)
+    exceptions = verb.get("exceptions", {})
+    if not isinstance(exceptions, dict) or not all(isinstance(forms, dict) for forms in exceptions.values()):
+        return "exceptions must map a tense to {pronoun: form}"
+    return None
+
+@lru_cache(maxsize=None)
+def templates(pattern, tense):
+    # Format strings for every pronoun; {0} {1} {2} are the radicals
+    if pattern not in PATTERNS:
+        raise ValueError(f"Unknown pattern {pattern!r}, expected one of {', '.join(PATTERNS)}")
+    past_vowel, present_vowel = (VOWELS[vowel] for vowel in pattern.split("-"))
+    rows = []
+    for pronoun, meaning in STANDARD_PRONOUNS:
+        if tense == "past":
+            form = "{0}" + FATHA + "{1}" + past_vowel + "{2}" + PAST_ENDINGS[pronoun]
+        elif tense == "present":
+            prefix, ending = PRESENT_AFFIXES[pronoun]
+            form = prefix + "{0}" + SUKUN + "{1}" + present_vowel + "{2}" + ending
+        else:
+            raise ValueError(f"Unknown tense {tense!r}")
+        rows.append((pronoun, form, meaning))
+    return tuple(rows)
+
+@lru_cache(maxsize=65536)
+def conjugate(root, pattern, tense):
+    # ((pronoun, conjugation, meaning), ...) for a regular root
+    radicals = split_root(root)
+    return tuple((pronoun, form.format(*radicals), meaning) for pronoun, form, meaning in templates(pattern, tense))
+
+def conjugate_verb(verb, tense):
+    # Pronoun table for a compact deck entry, with its exceptions applied
+    exceptions = verb.get("exceptions", {}).get(tense, {})
+    return [
+        {"pronoun": pronoun, "conjugation": exceptions.get(pronoun, form), "meaning": meaning}
+        for pronoun, form, meaning in conjugate(verb["root"], verb["pattern"], tense)
+    ]
+
+def expand_verb(verb):
+    # Full deck entry with generated tables for every missing tense
+    if "pattern" not in verb or all(tense in verb for tense in TENSES):
+        return verb
+    expanded = {key: value for key, value in verb.items() if key not in ("pattern", "exceptions")}
+    for tense in TENSES:
+        if tense not in verb:
+            expanded[tense] = conjugate_verb(verb, tense)
+    return expanded
+
+def expand_deck(verbs):
+    return [expand_verb(verb) for verb in verbs]
+
+def diff_verb(verb, pattern):
+    # (tense, pronoun, stored form, generated form) for every disagreement
+    differences = []
+    for tense in TENSES:
+        stored = {row["pronoun"]: row["conjugation"] for row in verb.get(tense, ())}
+        generated = {pronoun: form for pronoun, form, _ in conjugate(verb["root"], pattern, tense)}
+        for pronoun in list(generated) + [pronoun for pronoun in stored if pronoun not in generated]:
+            if stored.get(pronoun) != generated.get(pronoun):
+                differences.append((tense, pronoun, stored.get(pronoun), generated.get(pronoun)))
+    return differences
+
+def best_pattern(verb):
+    # Pattern that reproduces most of the stored forms, with its differences
+    if "pattern" in verb:
+        return verb["pattern"], diff_verb(verb, verb["pattern"])
+    return min(((pattern, diff_verb(verb, pattern)) for pattern in PATTERNS), key=lambda item: len(item[1]))
+
+def compact_verb(verb, max_exceptions=4):
+    if "root" not in verb or not is_regular_root(verb["root"]) or not all(tense in verb for tense in TENSES):
+        return verb
+    # Rows with their own meaning or extra keys cannot be regenerated
+    standard_meanings = dict(STANDARD_PRONOUNS)
+    for tense in TENSES:
+        for row in verb[tense]:
+            if set(row) - {"pronoun", "conjugation", "meaning"} or row.get("meaning") != standard_meanings.get(row.get("pronoun")):
+                return verb
+    
+    pattern, differences = best_pattern(verb)
+    # Only forms that replace a generated one can be stored as exceptions
+    if len(differences) > max_exceptions or any(stored is None or generated is None for _, _, stored, generated in differences):
+        return verb
+
+    compact = {key: value for key, value in verb.items() if key not in TENSES}
+    compact["pattern"] = pattern
+    if differences:
+        exceptions = {}
+        for tense, pronoun, stored, _ in differences:
+            exceptions.setdefault(tense, {})[pronoun] = stored
+        compact["exceptions"] = exceptions
+    return compact
+
+def compact_deck(verbs, max_exceptions=4):
+    return [compact_verb(verb, max_exceptions) for verb in verbs]
+
+def verify_deck(verbs):
+    # Compare the rules with the stored tables; returns the number of verbs that disagree
+    mismatched = 0
+    skipped = 0
+    for index, verb in enumerate(verbs):
+        if "root" not in verb or not is_regular_root(verb["root"]) or not all(tense in verb for tense in TENSES):
+            skipped += 1
+            continue
+        pattern, differences = best_pattern(verb)
+        if not differences:
+            continue
+        mismatched += 1
+        print(f"#{index} {verb.get('infinitive', '?')} ({verb['root']}, pattern {pattern}):")
+        for tense, pronoun, stored, generated in differences:
+            print(f"    {tense:<8} {pronoun:<5} stored {stored or '-'}  generated {generated or '-'}")
+    checked = len(verbs) - skipped
+    print(f"{checked} verbs checked, {mismatched} differ from the rules, {skipped} irregular or incomplete skipped")
+    return mismatched
+
+def load_deck(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_deck(deck, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(deck, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("verify", "compact", "expand"):
+        print("Usage: python conjugation.py verify|compact|expand input.json [output.json]")
+        sys.exit(2)
+    command, input_path = sys.argv[1], sys.argv[2]
+    deck = load_deck(input_path)
+    if command == "verify":
+        sys.exit(1 if verify_deck(deck["verbs"]) else 0)
+
+    output_path = sys.argv[3] if len(sys.argv) > 3 else input_path
+    if command == "compact":
+        deck["verbs"] = compact_deck(deck["verbs"])
+    else:
+        deck["verbs"] = expand_deck(deck["verbs"])
+    save_deck(deck, output_path)
+    print(f"Wrote {len(deck['verbs'])} verbs to {output_path}")
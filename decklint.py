@@ -0,0 +1,386 @@
+# Deck linter: checks verb decks before they are published.
+#
+# load_verbs trusts the data, so a missing tense, a pronoun table that does
+# not match the standard pronouns, an empty conjugation or a root that does
+# not fit the infinitive only shows up when a learner reaches that verb. The
+# linter checks every verb against the deck schema and these rules and
+# reports each problem as file:line, like a compiler.
+#
+# The main process decodes only the first verb of each deck's "verbs" array
+# and cuts the rest into chunks of about CHUNK_SIZE characters, at places
+# that look like the gap between the first two verbs; a process pool decodes
+# and checks the chunks. A cut can land inside a verb, so every chunk reports
+# where its verbs end, and a deck whose chunks do not join up is decoded in
+# the main process to cut it exactly. Duplicate verbs are found afterwards
+# from the keys the chunks return. Only the standard library is imported here, so starting a worker
+# does not load pygame.
+#
+#   python decklint.py [verbs.json decks ...] [--jobs N]
+#
+# Exits with status 1 when any deck has errors, so it can gate a publish.
+import os
+import re
+import sys
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import conjugation
+from search import normalize
+
+DEFAULT_PATHS = ("verbs.json", "decks")
+CHUNK_SIZE = 4 * 1024 * 1024  # Characters per task sent to the pool, roughly
+
+ERROR = "error"
+WARNING = "warning"
+
+STANDARD_ORDER = [pronoun for pronoun, _ in conjugation.STANDARD_PRONOUNS]
+STANDARD_MEANINGS = dict(conjugation.STANDARD_PRONOUNS)
+# Radicals that may change or disappear in the infinitive (hamza seats are
+# already folded to their base letter by normalize)
+WEAK_RADICALS = set("اويء")
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+OBJECT_OPENING = re.compile(r'\{[ \t\n\r]*"[^"\\]*"')
+
+def radicals_match(radicals, skeleton, position=0):
+    # True when the radicals appear in order in the skeleton; weak ones may be missing
+    if not radicals:
+        return True
+    found = skeleton.find(radicals[0], position)
+    if found >= 0 and radicals_match(radicals[1:], skeleton, found + 1):
+        return True
+    return radicals[0] in WEAK_RADICALS and radicals_match(radicals[1:], skeleton, position)
+
+def lint_root(root, infinitive):
+    radicals = [normalize(letter) for letter in root.split("-")]
+    if len(radicals) not in (3, 4) or not all(len(letter) == 1 for letter in radicals):
+        return [(ERROR, f'root "{root}" is not 3 or 4 letters separated by "-"')]
+    if not isinstance(infinitive, str):
+        return []
+    # The second radical of a doubled root is written once, with shadda
+    radicals = [letter for i, letter in enumerate(radicals) if i == 0 or letter != radicals[i - 1]]
+    if not radicals_match(radicals, normalize(infinitive).replace(" ", "")):
+        return [(ERROR, f'root "{root}" does not match the consonants of "{infinitive}"')]
+    return []
+
+def lint_pattern(verb):
+    # Compact entry: the tables are generated from root and pattern
+    problems = []
+    if verb["pattern"] not in conjugation.PATTERNS:
+        problems.append((ERROR, f'unknown pattern {verb["pattern"]!r}, expected one of {", ".join(conjugation.PATTERNS)}'))
+    if not isinstance(verb.get("root"), str):
+        problems.append((ERROR, '"pattern" needs a "root"'))
+    else:
+        try:
+            conjugation.split_root(verb["root"])
+        except ValueError as e:
+            problems.append((ERROR, str(e)))
+    exceptions = verb.get("exceptions", {})
+    if not isinstance(exceptions, dict):
+        return problems + [(ERROR, '"exceptions" is not an object')]
+    for tense, forms in exceptions.items():
+        if tense not in conjugation.TENSES:
+            problems.append((ERROR, f"exceptions: unknown tense {tense!r}"))
+        elif not isinstance(forms, dict):
+            problems.append((ERROR, f"exceptions.{tense} is not an object"))
+        else:
+            for pronoun, form in forms.items():
+                if pronoun not in STANDARD_MEANINGS:  # JSON object keys are always strings
+                    problems.append((ERROR, f"exceptions.{tense}: unknown pronoun {pronoun!r}"))
+                elif not isinstance(form, str) or not form.strip():
+                    problems.append((ERROR, f"exceptions.{tense} ({pronoun}): empty conjugation"))
+    return problems
+
+def lint_table(tense, rows):
+    if not isinstance(rows, list):
+        return [(ERROR, f'"{tense}" is not a list of pronoun rows')]
+    # Fast path for the usual table: the standard pronouns, in order, all with a form
+    try:
+        if [(row["pronoun"], row["meaning"]) for row in rows] == conjugation.STANDARD_PRONOUNS and all(row["conjugation"].strip() for row in rows):
+            return []
+    except (TypeError, KeyError, AttributeError):
+        pass
+    problems = []
+    pronouns = []
+    other_meanings = []
+    for index, row in enumerate(rows):
+        where = f"{tense}[{index}]"
+        if not isinstance(row, dict):
+            problems.append((ERROR, f"{where} is not an object"))
+            continue
+        pronoun = row.get("pronoun")
+        meaning = row.get("meaning")
+        # Checked before the lookups: a list or object would not even hash
+        if not isinstance(pronoun, str) or pronoun not in STANDARD_MEANINGS:
+            problems.append((ERROR, f"{where}: unknown pronoun {pronoun!r}"))
+        elif meaning is not None and not isinstance(meaning, str):
+            problems.append((ERROR, f"{where} ({pronoun}): meaning {meaning!r} is not a string"))
+        elif pronoun in pronouns:
+            problems.append((ERROR, f"{where}: pronoun {pronoun} appears twice"))
+        elif meaning != STANDARD_MEANINGS[pronoun]:
+            other_meanings.append(pronoun)
+        pronouns.append(pronoun)
+        form = row.get("conjugation")
+        if not isinstance(form, str) or not form.strip():
+            problems.append((ERROR, f"{where} ({pronoun}): empty conjugation"))
+    missing = [pronoun for pronoun in STANDARD_ORDER if pronoun not in pronouns]
+    if missing:
+        problems.append((ERROR, f"{tense}: missing pronouns {', '.join(missing)}"))
+    elif pronouns != STANDARD_ORDER and len(pronouns) == len(STANDARD_ORDER):
+        problems.append((WARNING, f"{tense}: pronouns are not in the standard order"))
+    if other_meanings:
+        # The app keys pronouns by (pronoun, meaning), so these become extra pronouns
+        problems.append((WARNING, f"{tense}: {', '.join(other_meanings)} do not have the standard meaning"))
+    return problems
+
+def lint_verb(verb):
+    # (severity, message) for every problem of one deck entry
+    if not isinstance(verb, dict):
+        return [(ERROR, "verb is not an object")]
+    problems = []
+    for field in ("infinitive", "meaning"):
+        if not isinstance(verb.get(field), str) or not verb[field].strip():
+            problems.append((ERROR, f'missing or empty "{field}"'))
+    if "root" in verb:
+        if isinstance(verb["root"], str):
+            problems.extend(lint_root(verb["root"], verb.get("infinitive")))
+        else:
+            problems.append((ERROR, '"root" is not a string'))
+    if "pattern" in verb:
+        problems.extend(lint_pattern(verb))
+    for tense in conjugation.TENSES:
+        if tense in verb:
+            problems.extend(lint_table(tense, verb[tense]))
+        elif "pattern" not in verb:
+            problems.append((ERROR, f'missing "{tense}" table'))
+    return problems
+
+def skip(text, pos):
+    return WHITESPACE.match(text, pos).end()
+
+def expect(text, char, pos, message=None):
+    pos = skip(text, pos)
+    if not text.startswith(char, pos):
+        raise json.JSONDecodeError(message or f"Expecting {char!r}", text, pos)
+    return pos + 1
+
+def lint_chunk(path, first_line, text, last):
+    # Problems, (infinitive, root, line) keys and the number of verbs checked
+    # in a run of verbs, and where the run ends: just after the verbs array's
+    # "]" in the last chunk of a deck, at the end of the text (after a ",")
+    # in the others. The end is None when the text does not split into whole
+    # verbs that way, which is how a chunk cut inside a verb shows up.
+    decoder = json.JSONDecoder()
+    problems = []
+    keys = []
+    checked = 0
+    line = first_line
+    previous = 0
+    pos = 0
+    while True:
+        line += text.count("\n", previous, pos)
+        previous = pos
+        try:
+            verb, pos = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            return problems, keys, checked, None
+        checked += 1
+        label = verb.get("infinitive") if isinstance(verb, dict) else None
+        label = label if isinstance(label, str) and label else "?"
+        for severity, message in lint_verb(verb):
+            problems.append((path, line, severity, f"{label}: {message}"))
+        if label != "?":
+            root = verb.get("root")
+            keys.append((label, root if isinstance(root, str) else "", line))
+        pos = skip(text, pos)
+        if last and text.startswith("]", pos):
+            return problems, keys, checked, pos + 1
+        if not text.startswith(",", pos):
+            return problems, keys, checked, None
+        pos = skip(text, pos + 1)
+        if pos == len(text):
+            return problems, keys, checked, None if last else pos
+
+def deck_end(text, pos):
+    # Checks the rest of a deck from just after a member's value: further
+    # members, the closing "}" and nothing after it
+    decoder = json.JSONDecoder()
+    pos = skip(text, pos)
+    while text.startswith(",", pos):
+        _, pos = decoder.raw_decode(text, skip(text, pos + 1))
+        _, pos = decoder.raw_decode(text, skip(text, expect(text, ":", pos)))
+        pos = skip(text, pos)
+    pos = expect(text, "}", pos)
+    if skip(text, pos) != len(text):
+        raise json.JSONDecodeError("Extra data", text, skip(text, pos))
+
+def verbs_start(text):
+    # Offset just inside the top-level "verbs" array; the members before it
+    # are checked on the way. Like everything here it raises
+    # json.JSONDecodeError, which knows the line and column.
+    decoder = json.JSONDecoder()
+    pos = expect(text, "{", 0, "Expecting a JSON object with a \"verbs\" array")
+    if not text.startswith("}", skip(text, pos)):
+        while True:
+            key, pos = decoder.raw_decode(text, skip(text, pos))
+            pos = expect(text, ":", pos)
+            if key == "verbs":
+                return expect(text, "[", pos, "\"verbs\" is not an array")
+            _, pos = decoder.raw_decode(text, skip(text, pos))
+            pos = skip(text, pos)
+            if not text.startswith(",", pos):
+                break
+            pos += 1
+    deck_end(text, pos)
+    raise json.JSONDecodeError("No \"verbs\" array", text, 0)
+
+def verb_spans(text):
+    # (start, end) offsets of the elements of the top-level "verbs" array
+    decoder = json.JSONDecoder()
+    spans = []
+    pos = skip(text, verbs_start(text))
+    if not text.startswith("]", pos):
+        while True:
+            start = pos
+            _, pos = decoder.raw_decode(text, start)
+            spans.append((start, pos))
+            pos = skip(text, pos)
+            if not text.startswith(",", pos):
+                break
+            pos = skip(text, pos + 1)
+    deck_end(text, expect(text, "]", pos))
+    return spans
+
+def guessed_starts(text, chunk_size=CHUNK_SIZE):
+    # Offsets of the first verb and of verbs about chunk_size characters
+    # apart. Only the first verb is decoded: a later start is the next place
+    # where the text between the first two verbs appears again, together with
+    # the second verb's opening up to its first key. A row inside a verb can
+    # look the same; lint_chunk notices when a chunk was cut there.
+    first = skip(text, verbs_start(text))
+    if text.startswith("]", first):
+        deck_end(text, first + 1)
+        return []
+    end = json.JSONDecoder().raw_decode(text, first)[1]
+    second = skip(text, end)
+    if not text.startswith(",", second):
+        return [first]
+    second = skip(text, second + 1)
+    opening = OBJECT_OPENING.match(text, second)
+    if not opening:
+        return [first]
+    marker = text[end - 1:opening.end()]
+    starts = [first]
+    while True:
+        found = text.find(marker, starts[-1] + chunk_size)
+        if found < 0:
+            return starts
+        starts.append(found + second - end + 1)
+
+def verb_starts(text, chunk_size=CHUNK_SIZE):
+    # Like guessed_starts, but every verb is decoded to find them
+    starts = []
+    for start, _ in verb_spans(text):
+        if not starts or start - starts[-1] >= chunk_size:
+            starts.append(start)
+    return starts
+
+def deck_chunks(path, text, starts):
+    # (path, first line, text, last) tasks for lint_chunk, cut at the given verb starts
+    chunks = []
+    line = 1
+    previous = 0
+    for i, start in enumerate(starts):
+        line += text.count("\n", previous, start)
+        previous = start
+        last = i + 1 == len(starts)
+        chunks.append((path, line, text[start:len(text) if last else starts[i + 1]], last))
+    return chunks
+
+def chunks_join(deck):
+    # Whether each of a deck's (chunk, result) pairs ended where the next
+    # chunk starts, and the deck is well formed after the verbs array
+    if any(result[3] is None for _, result in deck):
+        return False
+    try:
+        deck_end(deck[-1][0][2], deck[-1][1][3])
+    except json.JSONDecodeError:
+        return False
+    return True
+
+def read_deck(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def deck_error(path, e):
+    if isinstance(e, json.JSONDecodeError):
+        return (path, e.lineno, ERROR, f"invalid JSON: {e.msg} (column {e.colno})")
+    return (path, 1, ERROR, f"cannot read deck: {e}")
+
+def deck_paths(paths, defaults=False):
+    # Files as given, and the *.json files of directories in name order;
+    # the default paths are skipped when they do not exist
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".json"))
+        elif os.path.exists(path) or not defaults:
+            found.append(path)
+    return found
+
+def lint_decks(paths, jobs=None):
+    # (problems sorted by file and line, number of verbs checked)
+    problems = []
+    chunks = []
+    for path in paths:
+        try:
+            text = read_deck(path)
+            chunks.extend(deck_chunks(path, text, guessed_starts(text, CHUNK_SIZE)))
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            problems.append(deck_error(path, e))
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(chunks) <= 1:  # No pool for a single chunk, or none when every deck failed to parse
+        results = [lint_chunk(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(min(jobs, len(chunks))) as pool:
+            results = list(pool.map(lint_chunk, *zip(*chunks)))
+
+    verbs = 0
+    first_seen = {}  # (path, infinitive, root) -> line of the first copy
+    for path in paths:
+        deck = [(chunk, result) for chunk, result in zip(chunks, results) if chunk[0] == path]
+        if deck and not chunks_join(deck):
+            # A guess cut a verb, or some verb is not valid JSON: decode the
+            # whole deck here to cut it exactly or find the error's position
+            try:
+                text = read_deck(path)
+                deck = [(chunk, lint_chunk(*chunk)) for chunk in deck_chunks(path, text, verb_starts(text, CHUNK_SIZE))]
+            except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+                problems.append(deck_error(path, e))
+                deck = []
+        for _, (chunk_problems, keys, checked, _) in deck:
+            problems.extend(chunk_problems)
+            verbs += checked
+            for infinitive, root, line in keys:
+                first = first_seen.setdefault((path, infinitive, root), line)
+                if first != line:
+                    problems.append((path, line, WARNING, f"{infinitive}: duplicate of the verb on line {first}, which the app keeps"))
+    problems.sort(key=lambda problem: (paths.index(problem[0]), problem[1]))
+    return problems, verbs
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    jobs = None
+    if "--jobs" in args:
+        jobs = int(args[args.index("--jobs") + 1])
+        del args[args.index("--jobs"):args.index("--jobs") + 2]
+    paths = deck_paths(args or DEFAULT_PATHS, defaults=not args)
+    if not paths:
+        print("No decks to check")
+        sys.exit(2)
+    problems, verbs = lint_decks(paths, jobs)
+    for path, line, severity, message in problems:
+        print(f"{path}:{line}: {severity}: {message}")
+    errors = sum(1 for problem in problems if problem[2] == ERROR)
+    print(f"{verbs} verbs in {len(paths)} decks: {errors} errors, {len(problems) - errors} warnings")
+    sys.exit(1 if errors else 0)
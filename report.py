@@ -0,0 +1,285 @@
+# Term report over the session logs (sessions.sqlite3) of many learners.
+#
+# Each log is read in chunks of CHUNK_ROWS events and turned into columnar
+# NumPy arrays. Card keys are dictionary-encoded with np.unique, so only the
+# distinct cards of a chunk go through Python, and every total is an
+# np.bincount over card ids. Memory grows with the number of distinct cards,
+# not with the number of events, so a term of millions of events is a single
+# streaming pass. Figures per verb, pronoun and tense are rolled up from the
+# per-card totals at the end.
+#
+#   python report.py logs/ --csv report.csv --html report.html
+#   python report.py alice.sqlite3 bob.sqlite3 --csv report.csv
+#
+# Needs NumPy (pip install numpy); the app itself does not.
+import os
+import sys
+import csv
+import html
+import sqlite3
+import time
+from urllib.request import pathname2url
+
+import numpy as np
+
+import sessionlog
+
+CHUNK_ROWS = 200000
+WEEK = 7 * 24 * 3600
+MIN_ANSWERS = 10  # Verbs answered fewer times are left out of the "hardest" table
+HARDEST_COUNT = 30
+
+# Kinds as small integers; the query does the coding so no row is looked at in Python
+SHOWN, REVEAL, ANSWER = range(3)
+QUERY = f"""
+SELECT CASE kind WHEN '{sessionlog.SHOWN}' THEN {SHOWN} WHEN '{sessionlog.REVEAL}' THEN {REVEAL} ELSE {ANSWER} END,
+       card, IFNULL(correct, -1), IFNULL(elapsed, 0), time
+FROM events WHERE kind IN ('{sessionlog.SHOWN}', '{sessionlog.REVEAL}', '{sessionlog.ANSWER}')
+"""
+
+# Time-to-reveal histogram: bin i holds REVEAL_EDGES[i] <= seconds < REVEAL_EDGES[i + 1]
+REVEAL_EDGES = np.array([0, 1, 2, 3, 5, 8, 13, 21, 34, 60, 120, np.inf])
+REVEAL_BINS = len(REVEAL_EDGES) - 1
+
+COUNTERS = ("shown", "reveals", "answers", "errors")
+CSV_FIELDS = ("level", "infinitive", "root", "pronoun", "selected_tense", "shown", "answers", "errors",
+              "error_rate", "reveals", "reveal_rate", "reveal_median_s", "reveal_p90_s")
+
+def find_logs(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.endswith(".sqlite3"):
+                        yield os.path.join(directory, name)
+        else:
+            yield path
+
+def grow(array, size):
+    # Extend a per-card array with zeros when new cards appear
+    if len(array) >= size:
+        return array
+    grown = np.zeros((size,) + array.shape[1:], array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+class Totals:
+    def __init__(self):
+        self.card_ids = {}  # card key -> card id
+        self.cards = []
+        self.counts = {name: np.zeros(0, np.int64) for name in COUNTERS}
+        self.reveal_hist = np.zeros((0, REVEAL_BINS), np.int64)
+        self.weeks = {}  # week number -> counts of shown, reveals, answers, errors
+        self.events = 0
+        self.logs = 0
+
+    def card_id(self, card):
+        card_id = self.card_ids.get(card)
+        if card_id is None:
+            card_id = len(self.cards)
+            self.card_ids[card] = card_id
+            self.cards.append(card)
+        return card_id
+
+    def add_log(self, path):
+        # Read-only, so a mistyped path is reported instead of silently
+        # created as an empty database
+        if not os.path.isfile(path):
+            print(f"Skipping {path}: no such file")
+            return
+        try:
+            connection = sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode=ro", uri=True)
+            cursor = connection.execute(QUERY)
+        except sqlite3.Error as e:
+            print(f"Skipping {path}: {e}")
+            return
+        self.logs += 1
+        try:
+            while True:
+                rows = cursor.fetchmany(CHUNK_ROWS)
+                if not rows:
+                    break
+                self.add_chunk(rows)
+        finally:
+            connection.close()
+
+    def add_chunk(self, rows):
+        kinds, cards, correct, elapsed, times = zip(*rows)
+        kind = np.array(kinds, np.int8)
+        correct = np.array(correct, np.int8)
+        elapsed = np.array(elapsed, np.float64)
+        week = (np.array(times, np.float64) // WEEK).astype(np.int64)
+
+        uniques, inverse = np.unique(np.array(cards), return_inverse=True)
+        ids = np.fromiter((self.card_id(card) for card in uniques.tolist()), np.int64, len(uniques))
+        card = ids[inverse.ravel()]
+        size = len(self.cards)
+        self.events += len(kind)
+
+        masks = {
+            "shown": kind == SHOWN,
+            "reveals": kind == REVEAL,
+            "answers": kind == ANSWER,
+            "errors": (kind == ANSWER) & (correct == 0),
+        }
+        for name, mask in masks.items():
+            counts = grow(self.counts[name], size)
+            counts += np.bincount(card[mask], minlength=size)
+            self.counts[name] = counts
+
+        reveal = masks["reveals"]
+        bins = np.searchsorted(REVEAL_EDGES, elapsed[reveal], side="right") - 1
+        flat = card[reveal] * REVEAL_BINS + np.clip(bins, 0, REVEAL_BINS - 1)
+        self.reveal_hist = grow(self.reveal_hist, size)
+        self.reveal_hist += np.bincount(flat, minlength=size * REVEAL_BINS).reshape(size, REVEAL_BINS)
+
+        # Weekly trend: a handful of distinct weeks per chunk
+        week_values, week_index = np.unique(week, return_inverse=True)
+        week_index = week_index.ravel()
+        per_week = np.stack([np.bincount(week_index[mask], minlength=len(week_values)) for mask in masks.values()])
+        for column, value in enumerate(week_values.tolist()):
+            totals = self.weeks.setdefault(value, np.zeros(len(COUNTERS), np.int64))
+            totals += per_week[:, column]
+
+    def card_fields(self):
+        # infinitive, root, tense and pronoun of every card id (see card_key in the app)
+        columns = [[], [], [], []]
+        for card in self.cards:
+            for column, part in zip(columns, (card.split("|") + ["", "", ""])[:4]):
+                column.append(part)
+        return columns
+
+    def rollup(self, *keys):
+        # Totals per distinct combination of the given per-card key arrays
+        if not self.cards:
+            return [], {name: np.zeros(0, np.int64) for name in COUNTERS}, np.zeros((0, REVEAL_BINS), np.int64)
+        combined = np.array(["\x1f".join(values) for values in zip(*keys)])
+        labels, group = np.unique(combined, return_inverse=True)
+        group = group.ravel()
+        counts = {name: np.bincount(group, weights=self.counts[name], minlength=len(labels)).astype(np.int64)
+                  for name in COUNTERS}
+        hist = np.zeros((len(labels), REVEAL_BINS), np.int64)
+        np.add.at(hist, group, self.reveal_hist)
+        return [label.split("\x1f") for label in labels.tolist()], counts, hist
+
+def rate(numerator, denominator):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / np.maximum(denominator, 1), np.nan)
+
+def hist_quantile(hist, fraction):
+    # Upper edge of the bin holding the given fraction of each row's reveals
+    totals = hist.sum(axis=1)
+    cumulative = hist.cumsum(axis=1)
+    bins = (cumulative < (fraction * totals)[:, None]).sum(axis=1)
+    edges = REVEAL_EDGES[1:][np.minimum(bins, REVEAL_BINS - 1)]
+    return np.where(totals > 0, edges, np.nan)
+
+def summary_rows(level, labels, counts, hist, fields):
+    error_rate = rate(counts["errors"], counts["answers"])
+    reveal_rate = rate(counts["reveals"], counts["shown"])
+    median = hist_quantile(hist, 0.5)
+    p90 = hist_quantile(hist, 0.9)
+    rows = []
+    for i, label in enumerate(labels):
+        row = {"level": level}
+        row.update(zip(fields, label))
+        row.update({name: int(counts[name][i]) for name in COUNTERS})
+        row["error_rate"] = error_rate[i]
+        row["reveal_rate"] = reveal_rate[i]
+        row["reveal_median_s"] = median[i]
+        row["reveal_p90_s"] = p90[i]
+        rows.append(row)
+    return rows
+
+def build_report(totals):
+    infinitive, root, tense, pronoun = totals.card_fields()
+    report = {}
+    report["tense"] = summary_rows("tense", *totals.rollup(tense), ["selected_tense"])
+    report["pronoun"] = summary_rows("pronoun", *totals.rollup(pronoun), ["pronoun"])
+    report["verb"] = summary_rows("verb", *totals.rollup(infinitive, root), ["infinitive", "root"])
+    report["card"] = summary_rows("card", *totals.rollup(infinitive, root, tense, pronoun),
+                                  ["infinitive", "root", "selected_tense", "pronoun"])
+    report["reveal_hist"] = totals.reveal_hist.sum(axis=0)
+    report["weeks"] = sorted(totals.weeks.items())
+    return report
+
+def format_value(value):
+    if isinstance(value, float):
+        if np.isnan(value):
+            return ""
+        if np.isinf(value):
+            return f">{REVEAL_EDGES[-2]:g}"
+        return f"{value:.3f}" if value < 1 else f"{value:g}"
+    return value
+
+def write_csv(report, path):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for level in ("tense", "pronoun", "verb", "card"):
+            for row in report[level]:
+                writer.writerow({key: format_value(value) for key, value in row.items()})
+
+def html_table(headers, rows):
+    lines = ["<table>", "<tr>" + "".join(f"<th>{html.escape(header)}</th>" for header in headers) + "</tr>"]
+    for row in rows:
+        lines.append("<tr>" + "".join(f"<td>{html.escape(str(format_value(value)))}</td>" for value in row) + "</tr>")
+    lines.append("</table>")
+    return "\n".join(lines)
+
+def summary_table(rows, fields):
+    headers = list(fields) + ["shown", "answers", "error_rate", "reveals", "reveal_rate", "reveal_median_s", "reveal_p90_s"]
+    return html_table(headers, [[row.get(header, "") for header in headers] for row in rows])
+
+def write_html(report, totals, path):
+    hardest = [row for row in report["verb"] if row["answers"] >= MIN_ANSWERS]
+    hardest.sort(key=lambda row: -row["error_rate"])
+    edges = REVEAL_EDGES
+    reveal_rows = [[f"{edges[i]:g}–{edges[i + 1]:g} s" if np.isfinite(edges[i + 1]) else f">{edges[i]:g} s", int(count)]
+                   for i, count in enumerate(report["reveal_hist"])]
+    week_rows = []
+    for week, (shown, reveals, answers, errors) in report["weeks"]:
+        start = time.strftime("%Y-%m-%d", time.gmtime(week * WEEK))
+        week_rows.append([start, int(shown), int(answers), rate(np.array(errors), np.array(answers)).item(),
+                          rate(np.array(reveals), np.array(shown)).item()])
+    parts = [
+        "<!DOCTYPE html>",
+        '<html><head><meta charset="utf-8"><title>Отчёт по занятиям</title>',
+        "<style>body{font-family:sans-serif} table{border-collapse:collapse;margin-bottom:2em}"
+        " td,th{border:1px solid #aaa;padding:2px 8px} td{text-align:right}</style></head><body>",
+        "<h1>Отчёт по занятиям</h1>",
+        f"<p>Журналов: {totals.logs}, событий: {totals.events}, карточек: {len(totals.cards)}</p>",
+        "<h2>По времени</h2>", summary_table(report["tense"], ["selected_tense"]),
+        "<h2>По местоимениям</h2>", summary_table(report["pronoun"], ["pronoun"]),
+        f"<h2>Самые трудные глаголы (не меньше {MIN_ANSWERS} ответов)</h2>",
+        summary_table(hardest[:HARDEST_COUNT], ["infinitive", "root"]),
+        "<h2>Время до показа ответа</h2>", html_table(["seconds", "reveals"], reveal_rows),
+        "<h2>По неделям</h2>", html_table(["week", "shown", "answers", "error_rate", "reveal_rate"], week_rows),
+        "</body></html>",
+    ]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(parts))
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    csv_path = html_path = None
+    if "--csv" in args:
+        csv_path = args.pop(args.index("--csv") + 1)
+        args.remove("--csv")
+    if "--html" in args:
+        html_path = args.pop(args.index("--html") + 1)
+        args.remove("--html")
+    if not args or not (csv_path or html_path):
+        print("Usage: python report.py LOG_OR_DIR... [--csv report.csv] [--html report.html]")
+        sys.exit(2)
+
+    start = time.perf_counter()
+    totals = Totals()
+    for path in find_logs(args):
+        totals.add_log(path)
+    report = build_report(totals)
+    if csv_path:
+        write_csv(report, csv_path)
+    if html_path:
+        write_html(report, totals, html_path)
+    print(f"{totals.events} events from {totals.logs} logs in {time.perf_counter() - start:.1f} s")
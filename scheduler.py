@@ -0,0 +1,219 @@
+# Spaced-repetition scheduling of practice cards.
+#
+# A card is one (verb, tense, pronoun) form. Cards the learner has seen are
+# kept in a heap ordered by due time, so picking the next question and
+# rescheduling an answered one are O(log n) however large the deck is.
+# Cards never seen before are drawn lazily from a shuffled order of the
+# practice set instead of being created up front.
+#
+# Progress is saved to an append-only journal, one JSON line per answer.
+# When the journal grows well past the number of cards it is compacted into
+# one line per card.
+import os
+import json
+import heapq
+import random
+import time
+from collections import deque
+
+# Review intervals in seconds
+FIRST_INTERVAL = 5 * 60
+SECOND_INTERVAL = 30 * 60
+RETRY_INTERVAL = 30  # A missed card comes back within the same session
+START_EASE = 2.5
+MIN_EASE = 1.3
+MAX_EASE = 3.0
+
+# Compact the journal when it has this many lines per card (plus a minimum)
+COMPACT_FACTOR = 3
+COMPACT_MIN_LINES = 1000
+
+class Card:
+    __slots__ = ("key", "due", "interval", "ease", "reps", "lapses")
+
+    def __init__(self, key, due=0.0, interval=0.0, ease=START_EASE, reps=0, lapses=0):
+        self.key = key
+        self.due = due
+        self.interval = interval
+        self.ease = ease
+        self.reps = reps
+        self.lapses = lapses
+
+    def review(self, correct, now):
+        if correct:
+            self.reps += 1
+            if self.reps == 1:
+                self.interval = FIRST_INTERVAL
+            elif self.reps == 2:
+                self.interval = SECOND_INTERVAL
+            else:
+                self.interval *= self.ease
+            self.ease = min(MAX_EASE, self.ease + 0.05)
+        else:
+            self.reps = 0
+            self.lapses += 1
+            self.interval = RETRY_INTERVAL
+            self.ease = max(MIN_EASE, self.ease - 0.2)
+        self.due = now + self.interval
+
+    def to_record(self):
+        return {"k": self.key, "d": round(self.due, 1), "i": round(self.interval, 1),
+                "e": round(self.ease, 3), "r": self.reps, "l": self.lapses}
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(record["k"], record["d"], record["i"], record["e"], record["r"], record["l"])
+
+class ReviewJournal:
+    def __init__(self, path):
+        self.path = path
+        self.lines = 0
+        self.file = None
+
+    def load(self):
+        # Later lines win; a line cut short by a crash is ignored
+        cards = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self.lines += 1
+                    try:
+                        card = Card.from_record(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    cards[card.key] = card
+        except FileNotFoundError:
+            pass
+        return cards
+
+    def append(self, card, cards):
+        if self.file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self.file = open(self.path, 'a', encoding='utf-8')
+        self.file.write(json.dumps(card.to_record(), ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.lines += 1
+        if self.lines > COMPACT_FACTOR * len(cards) + COMPACT_MIN_LINES:
+            self.compact(cards)
+
+    def compact(self, cards):
+        self.close()
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for card in cards.values():
+                f.write(json.dumps(card.to_record(), ensure_ascii=False) + "\n")
+        os.replace(temp_path, self.path)
+        self.lines = len(cards)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+class Scheduler:
+    def __init__(self, journal=None):
+        self.journal = journal  # None keeps progress in memory only
+        self.cards = journal.load() if journal else {}
+
+    def review(self, key, correct, now=None):
+        now = time.time() if now is None else now
+        card = self.cards.get(key)
+        if card is None:
+            card = Card(key)
+            self.cards[key] = card
+        card.review(correct, now)
+        if self.journal:
+            try:
+                self.journal.append(card, self.cards)
+            except OSError as e:
+                print(f"Could not save progress to {self.journal.path}: {e}")
+        return card
+
+    def close(self):
+        if self.journal:
+            self.journal.close()
+
+# Visits 0..size-1 in a random order without materializing the permutation:
+# a full-period linear congruential sequence modulo the next power of two,
+# skipping values that fall outside the range.
+class LazyShuffle:
+    def __init__(self, size, rng=random):
+        self.size = size
+        self.modulus = 1
+        while self.modulus < size:
+            self.modulus *= 2
+        self.multiplier = rng.randrange(0, self.modulus, 4) + 1 if self.modulus >= 4 else 1
+        self.increment = rng.randrange(1, self.modulus, 2) if self.modulus >= 2 else 0
+        self.value = rng.randrange(self.modulus)
+
+    def __iter__(self):
+        for _ in range(self.modulus):
+            self.value = (self.multiplier * self.value + self.increment) % self.modulus
+            if self.value < self.size:
+                yield self.value
+
+# Question queue for one practice session.
+# known: (key, payload) pairs for cards of the practice set the scheduler
+# has already seen; new_cards: iterator of (key, payload) pairs, consulted
+# only when no known card is due. The payload is whatever the caller needs
+# to show the card.
+class PracticeSession:
+    def __init__(self, scheduler, known, new_cards):
+        self.scheduler = scheduler
+        self.new_cards = new_cards
+        self.fresh = deque()  # New cards handed out but not reviewed yet
+        self.payloads = {}
+        self.heap = []
+        for key, payload in known:
+            self.payloads[key] = payload
+            self.heap.append((scheduler.cards[key].due, key))
+        heapq.heapify(self.heap)
+
+    def top(self):
+        # Drop heap entries left behind by cards that were rescheduled or dropped
+        while self.heap:
+            due, key = self.heap[0]
+            if key in self.payloads and self.scheduler.cards[key].due == due:
+                return due, key
+            heapq.heappop(self.heap)
+        return None
+
+    def fresh_cards(self):
+        # Unreviewed new cards come back first, so asking again or looking
+        # ahead does not skip past them
+        cards = self.scheduler.cards
+        while self.fresh and (self.fresh[0][0] in cards or self.fresh[0][0] not in self.payloads):
+            self.fresh.popleft()
+        for key, payload in list(self.fresh):
+            if key not in cards and key in self.payloads:
+                yield key, payload
+        for key, payload in self.new_cards:
+            if key not in cards:
+                self.payloads[key] = payload
+                self.fresh.append((key, payload))
+                yield key, payload
+
+    def next(self, now=None, skip=None):
+        # skip passes over one card, to look a question ahead of the current one
+        now = time.time() if now is None else now
+        top = self.top()
+        if top and top[0] <= now and top[1] != skip:
+            return top[1], self.payloads[top[1]]
+
+        for key, payload in self.fresh_cards():
+            if key != skip:
+                return key, payload
+
+        # Nothing due and nothing new: review the card that is due soonest
+        if top and top[1] != skip:
+            return top[1], self.payloads[top[1]]
+        return None
+
+    def review(self, key, correct, now=None):
+        card = self.scheduler.review(key, correct, now)
+        heapq.heappush(self.heap, (card.due, key))
+
+    def drop(self, key):
+        # The card can no longer be shown (its form left the deck); its
+        # progress is kept, the session just stops asking it
+        self.payloads.pop(key, None)
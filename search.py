@@ -0,0 +1,102 @@
+# Type-to-filter search over the verb deck.
+#
+# Every verb gets one normalized key built from its infinitive, root and
+# meaning: Arabic diacritics and tatweel are dropped, alef/hamza variants
+# are folded to their base letter and Russian is case-folded, so "كتب",
+# "كَتَبَ" and "ك-ت-ب" all find the same verb.
+#
+# The index maps every 1-, 2- and 3-letter substring of each field to the
+# sorted list of verbs containing it. A query of up to three letters is a
+# single lookup; a longer one starts from its rarest trigram and checks only
+# those verbs. Typing one more letter only re-checks the previous matches.
+import re
+import threading
+from array import array
+from collections import OrderedDict, defaultdict
+
+GRAM_SIZES = (1, 2, 3)
+FIELD_SEPARATOR = "\n"  # Never part of a normalized query
+
+# Harakat, Quranic marks, superscript alef and tatweel
+ARABIC_MARKS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+LETTER_FOLDS = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ؤ": "و", "ئ": "ي", "ى": "ي", "ة": "ه",
+    "ё": "е", "-": None,
+})
+SPACES = re.compile(r"\s+")
+
+def normalize(text):
+    text = ARABIC_MARKS.sub("", text).casefold().translate(LETTER_FOLDS)
+    return SPACES.sub(" ", text).strip()
+
+class SearchIndex:
+    def __init__(self, cache_size=32):
+        self.keys = []
+        self.postings = {}
+        self.ready = threading.Event()
+        self.cache = OrderedDict()  # recent query -> matches, so backspace is a lookup
+        self.cache_size = cache_size
+        self.last_query = None
+        self.last_matches = None
+
+    def build(self, fields):
+        # fields: one (infinitive, root, meaning) tuple per verb, in deck order
+        keys = []
+        postings = defaultdict(list)
+        for verb_index, texts in enumerate(fields):
+            normalized = [normalize(text) for text in texts if text]
+            keys.append(FIELD_SEPARATOR.join(normalized))
+            grams = {field[start:start + size]
+                     for field in normalized
+                     for size in GRAM_SIZES
+                     for start in range(len(field) - size + 1)}
+            for gram in grams:
+                postings[gram].append(verb_index)
+        self.keys = keys
+        self.postings = {gram: array('I', posting) for gram, posting in postings.items()}
+        self.ready.set()
+        return self
+
+    def build_in_background(self, fields):
+        # Building takes about a second per 25000 verbs; search() waits for it
+        thread = threading.Thread(target=self.build, args=(fields,), name="search-index", daemon=True)
+        thread.start()
+        return thread
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, text):
+        # Indices of matching verbs in deck order, or None for an empty query
+        query = normalize(text)
+        if not query:
+            return None
+        self.ready.wait()
+        matches = self.cache.get(query)
+        if matches is not None:
+            self.cache.move_to_end(query)
+        else:
+            matches = self.lookup(query)
+            self.cache[query] = matches
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        self.last_query = query
+        self.last_matches = matches
+        return matches
+
+    def lookup(self, query):
+        size = GRAM_SIZES[-1]
+        if len(query) <= size:
+            return self.postings.get(query, ())
+
+        # Candidates: the rarest trigram of the query, or the previous matches
+        # when the query only grew
+        candidates = min(
+            (self.postings.get(query[start:start + size], ()) for start in range(len(query) - size + 1)),
+            key=len
+        )
+        if self.last_query and query.startswith(self.last_query) and len(self.last_matches) < len(candidates):
+            candidates = self.last_matches
+        keys = self.keys
+        return array('I', [verb_index for verb_index in candidates if query in keys[verb_index]])
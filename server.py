@@ -0,0 +1,357 @@
+# Headless quiz server: one process runs the quiz for a whole classroom.
+#
+# Every learner gets the questions the app would ask - the spaced-repetition
+# queue from practice_session, multiple-choice options from choice_options,
+# typed answers checked with answers.check - as JSON over HTTP or a
+# WebSocket, and the client draws the text. The deck is loaded once and
+# shared by all sessions; once the distractor index is built the event loop
+# is the only thread that touches it, so its rows can still fill in lazily.
+# A session holds just its scheduler state and the current question. pygame
+# is imported with the app module but never initialized, so no display is
+# created.
+#
+#   python server.py [--host 127.0.0.1] [--port 8765] [--verbs verbs.json] [--decks DIR]
+#
+# HTTP, JSON bodies and replies:
+#   POST /session             {"tense": "past", "verb": -1, "mode": "choice"}  -> question
+#   GET  /session/ID          the current question
+#   POST /session/ID/answer   {"answer": "..."} or {"known": true}  -> result with the next question
+#   GET  /stats               session count and server CPU time
+# WebSocket on /ws: send {"type": "start", ...} or {"type": "answer", ...};
+# the replies are the same objects. The session ends with the connection.
+import os
+import sys
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import secrets
+
+import arabpython_v5 as app
+import answers
+import scheduler
+
+HOST = "127.0.0.1"
+PORT = 8765
+SESSION_TTL = 30 * 60  # HTTP sessions idle this long are dropped
+SWEEP_INTERVAL = 60
+MAX_BODY = 64 * 1024
+MAX_HEADERS = 100
+
+MODES = ("recall", "typed", "choice")
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# One learner's quiz. Questions and grading follow practice_screen.
+class QuizSession:
+    __slots__ = ("tense_index", "hard_mode", "mode", "practice", "key", "verb_index", "pronoun_index",
+                 "options", "last_seen")
+
+    def __init__(self, verb_table, tense_index, verb_index, mode):
+        self.tense_index = tense_index
+        self.hard_mode = verb_index == -1
+        self.mode = mode
+        practice_verbs = range(len(verb_table)) if self.hard_mode else [verb_index]
+        self.practice = app.practice_session(verb_table, tense_index, practice_verbs, scheduler.Scheduler())
+        self.options = None
+        self.last_seen = time.monotonic()
+        self.next_question(verb_table)
+
+    def next_question(self, verb_table):
+        card = self.practice.next()
+        if card is None:
+            self.key = None
+            return
+        self.key, (self.verb_index, self.pronoun_index) = card
+        if self.mode == "choice":
+            self.options = app.choice_options(verb_table, self.verb_index, self.tense_index, self.pronoun_index)
+
+    def question(self, verb_table):
+        if self.key is None:
+            return {"type": "done"}
+        verb = verb_table.verb(self.verb_index)
+        pronoun, pronoun_meaning = verb_table.pronouns[self.pronoun_index]
+        return {
+            "type": "question",
+            "card": self.key,
+            "tense": app.TENSES[self.tense_index],
+            "infinitive": verb.infinitive,
+            "meaning": verb.meaning,
+            "pronoun": pronoun,
+            "pronoun_meaning": pronoun_meaning,
+            "options": self.options,
+        }
+
+    def answer(self, verb_table, message):
+        if self.key is None:
+            raise RequestError(400, "no question to answer")
+        expected = verb_table.conjugation(self.verb_index, self.tense_index, self.pronoun_index)
+        status = None
+        if "known" in message:
+            # Self-graded, like "Знал, дальше" / "Не знал"
+            correct = bool(message["known"])
+        elif self.mode == "choice":
+            correct = message.get("answer") == expected
+        else:
+            status, _ = answers.check(verb_table.answer_key(self.verb_index, self.tense_index, self.pronoun_index),
+                                      str(message.get("answer", "")))
+            correct = status in (answers.EXACT, answers.SKELETON)
+        self.practice.review(self.key, correct)
+        self.next_question(verb_table)
+        return {"type": "result", "correct": correct, "status": status, "expected": expected,
+                "question": self.question(verb_table)}
+
+class QuizServer:
+    def __init__(self, verb_table):
+        self.verb_table = verb_table
+        self.sessions = {}  # session id -> QuizSession, for HTTP clients
+        self.requests = 0
+        self.websockets = 0
+
+    def start_session(self, message):
+        tense = message.get("tense", app.TENSES[0])
+        if tense not in app.TENSES:
+            raise RequestError(400, f"tense must be one of {', '.join(app.TENSES)}")
+        verb_index = message.get("verb", -1)
+        if isinstance(verb_index, bool) or not isinstance(verb_index, int) or not -1 <= verb_index < len(self.verb_table):
+            raise RequestError(400, "verb must be -1 (all verbs) or a verb index")
+        mode = message.get("mode", "typed")
+        if mode not in MODES:
+            raise RequestError(400, f"mode must be one of {', '.join(MODES)}")
+        return QuizSession(self.verb_table, app.TENSES.index(tense), verb_index, mode)
+
+    def session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise RequestError(404, "no such session")
+        session.last_seen = time.monotonic()
+        return session
+
+    def stats(self):
+        return {"sessions": len(self.sessions), "websockets": self.websockets, "requests": self.requests,
+                "verbs": len(self.verb_table), "cpu_s": time.process_time()}
+
+    def route(self, method, path, body):
+        parts = path.split("?", 1)[0].strip("/").split("/")
+        if parts == ["stats"] and method == "GET":
+            return self.stats()
+        if parts[0] != "session" or len(parts) > 3:
+            raise RequestError(404, "not found")
+        if len(parts) == 1:
+            if method != "POST":
+                raise RequestError(405, "use POST to start a session")
+            session = self.start_session(body)
+            session_id = secrets.token_urlsafe(12)
+            self.sessions[session_id] = session
+            return dict(session.question(self.verb_table), session=session_id)
+        session = self.session(parts[1])
+        if len(parts) == 2 and method == "GET":
+            return session.question(self.verb_table)
+        if len(parts) == 3 and parts[2] == "answer" and method == "POST":
+            return session.answer(self.verb_table, body)
+        raise RequestError(404, "not found")
+
+    async def sweep(self):
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL)
+            cutoff = time.monotonic() - SESSION_TTL
+            for session_id in [session_id for session_id, session in self.sessions.items() if session.last_seen < cutoff]:
+                del self.sessions[session_id]
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                self.requests += 1
+                if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                    await self.serve_websocket(reader, writer, headers)
+                    break
+                try:
+                    message = json.loads(body) if body else {}
+                    if not isinstance(message, dict):
+                        raise RequestError(400, "expected a JSON object")
+                    status, reply = 200, self.route(method, path, message)
+                except ValueError:
+                    status, reply = 400, {"error": "invalid JSON"}
+                except RequestError as e:
+                    status, reply = e.status, {"error": str(e)}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(http_response(status, reply, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except RequestError as e:
+            writer.write(http_response(e.status, {"error": str(e)}, False))
+        except ValueError:
+            writer.write(http_response(400, {"error": "malformed request"}, False))
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve_websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        self.websockets += 1
+        session = None
+        fragments = []  # Start of a message a control frame interrupted
+        try:
+            while True:
+                opcode, payload = await read_frame(reader, fragments)
+                if opcode == OP_CLOSE:
+                    writer.write(encode_frame(OP_CLOSE, payload[:2]))
+                    break
+                if opcode == OP_PING:
+                    writer.write(encode_frame(OP_PONG, payload))
+                    continue
+                if opcode != OP_TEXT:
+                    continue
+                self.requests += 1
+                try:
+                    message = json.loads(payload)
+                    if not isinstance(message, dict):
+                        raise RequestError(400, "expected a JSON object")
+                    if message.get("type") == "start":
+                        session = self.start_session(message)
+                        reply = session.question(self.verb_table)
+                    elif message.get("type") == "answer" and session is not None:
+                        reply = session.answer(self.verb_table, message)
+                    else:
+                        raise RequestError(400, "send a start message first")
+                except ValueError:
+                    reply = {"type": "error", "error": "invalid JSON"}
+                except RequestError as e:
+                    reply = {"type": "error", "error": str(e)}
+                writer.write(encode_frame(OP_TEXT, json.dumps(reply, ensure_ascii=False).encode()))
+                await writer.drain()
+        finally:
+            self.websockets -= 1
+
+async def read_request(reader):
+    # (method, path, lower-cased headers, body) of the next request, or None at end of stream
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise RequestError(400, "malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise RequestError(400, "too many headers")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY:
+        raise RequestError(413, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+def http_response(status, reply, keep_alive=True):
+    body = json.dumps(reply, ensure_ascii=False).encode()
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+# Just enough of RFC 6455 for JSON text messages
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_CONTINUATION, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+def encode_frame(opcode, payload, mask=None):
+    # Servers send unmasked frames; clients pass a 4-byte mask
+    length = len(payload)
+    if length < 126:
+        head = bytes([0x80 | opcode, length | (0x80 if mask else 0)])
+    elif length < 1 << 16:
+        head = bytes([0x80 | opcode, 126 | (0x80 if mask else 0)]) + length.to_bytes(2, "big")
+    else:
+        head = bytes([0x80 | opcode, 127 | (0x80 if mask else 0)]) + length.to_bytes(8, "big")
+    if mask:
+        return head + mask + apply_mask(payload, mask)
+    return head + payload
+
+def apply_mask(payload, mask):
+    # XOR with the repeated mask, done as one big integer instead of per byte
+    length = len(payload)
+    if not length:
+        return payload
+    repeated = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(length, "big")
+
+async def read_frame(reader, fragments=None):
+    # (opcode, payload) of the next message, with fragments joined. A control
+    # frame can arrive between fragments and is returned at once; pass the
+    # same fragments list on every call so the message read so far is kept
+    fragments = [] if fragments is None else fragments
+    while True:
+        first, second = await reader.readexactly(2)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = int.from_bytes(await reader.readexactly(2), "big")
+        elif length == 127:
+            length = int.from_bytes(await reader.readexactly(8), "big")
+        if length > MAX_BODY:
+            raise ConnectionError("websocket message too large")
+        mask = await reader.readexactly(4) if second & 0x80 else None
+        payload = await reader.readexactly(length)
+        if mask:
+            payload = apply_mask(payload, mask)
+        if opcode >= OP_CLOSE:
+            return opcode, payload
+        if opcode != OP_CONTINUATION:
+            fragments.clear()
+        fragments.append((opcode, payload))
+        if first & 0x80:
+            message_opcode = fragments[0][0]
+            payload = b"".join(part for _, part in fragments)
+            fragments.clear()
+            return message_opcode, payload
+
+async def serve(host=HOST, port=PORT):
+    verb_table = app.context.verb_table
+    # Built before serving rather than on a worker thread, so nothing else reads the deck meanwhile
+    app.context.distractor_index = answers.DistractorIndex().build(
+        verb_table.verb(verb_index).infinitive for verb_index in range(len(verb_table)))
+    quiz = QuizServer(verb_table)
+    server = await asyncio.start_server(quiz.handle_connection, host, port, backlog=1024)
+    sweeper = asyncio.ensure_future(quiz.sweep())
+    address = server.sockets[0].getsockname()
+    print(f"Serving {len(verb_table)} verbs on http://{address[0]}:{address[1]}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        sweeper.cancel()
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    host = args[args.index("--host") + 1] if "--host" in args else HOST
+    port = int(args[args.index("--port") + 1]) if "--port" in args else PORT
+    if "--verbs" in args:
+        app.context.json_path = args[args.index("--verbs") + 1]
+        app.context.compiled_path = os.path.splitext(app.context.json_path)[0] + ".bin"
+    if "--decks" in args:
+        app.context.decks_dir = args[args.index("--decks") + 1]
+    try:
+        asyncio.run(serve(host, port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,126 @@
+# Log of what happens in practice sessions, for finding the forms learners
+# struggle with.
+#
+# The screens only put a tuple on a bounded queue, which never blocks: when
+# the writer falls behind, events are dropped and counted instead of making
+# a frame wait for the disk. A writer thread drains the queue into SQLite
+# (WAL mode) and commits in batches, at most every FLUSH_INTERVAL seconds or
+# every BATCH_SIZE events. flush() waits until everything queued so far is
+# committed; the app calls it when the learner leaves a practice session.
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 2.0  # Seconds an event may wait in the queue before it is committed
+FLUSH_TIMEOUT = 5.0  # How long flush() waits for the writer
+
+# Event kinds
+SHOWN = "shown"  # A question was put on screen
+REVEAL = "reveal"  # The answer was shown without an answer from the learner
+ANSWER = "answer"  # The card was graded
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    session REAL NOT NULL,
+    time REAL NOT NULL,
+    kind TEXT NOT NULL,
+    card TEXT NOT NULL,
+    mode TEXT,
+    correct INTEGER,
+    answer TEXT,
+    elapsed REAL
+)
+"""
+INSERT = "INSERT INTO events (session, time, kind, card, mode, correct, answer, elapsed) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+class SessionLog:
+    def __init__(self, path, queue_size=QUEUE_SIZE):
+        self.path = path  # ":memory:" keeps the log in the writer thread only
+        self.session = time.time()  # Identifies this run of the app in the log
+        self.queue = queue.Queue(queue_size)
+        self.dropped = 0
+        self.thread = threading.Thread(target=self.run, name="session-log", daemon=True)
+        self.thread.start()
+
+    def log(self, kind, card, mode=None, correct=None, answer=None, elapsed=None):
+        if correct is not None:
+            correct = int(correct)
+        try:
+            self.queue.put_nowait((self.session, time.time(), kind, card, mode, correct, answer, elapsed))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=FLUSH_TIMEOUT):
+        # Wait until every event logged so far is committed
+        done = threading.Event()
+        try:
+            self.queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self):
+        if self.thread.is_alive():
+            self.flush()
+            self.queue.put(None)
+            self.thread.join(FLUSH_TIMEOUT)
+        if self.dropped:
+            print(f"Session log: {self.dropped} events dropped")
+
+    def connect(self):
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; only the last commits can be lost
+        connection.execute(SCHEMA)
+        connection.commit()
+        return connection
+
+    def run(self):
+        try:
+            connection = self.connect()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Could not open session log {self.path}: {e}")
+            connection = None
+
+        batch = []
+        waiting = []  # flush() calls to answer after the next commit
+        stop = False
+        deadline = None
+        while not stop:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False
+            if item is None:
+                stop = True
+            elif isinstance(item, threading.Event):
+                waiting.append(item)
+            elif item:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + FLUSH_INTERVAL
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (due or stop or waiting or len(batch) >= BATCH_SIZE):
+                if connection is not None:
+                    try:
+                        with connection:
+                            connection.executemany(INSERT, batch)
+                    except sqlite3.Error as e:
+                        print(f"Could not write session log {self.path}: {e}")
+                batch = []
+                deadline = None
+            for done in waiting:
+                done.set()
+            waiting = []
+
+        if connection is not None:
+            connection.close()
@@ -0,0 +1,37 @@
+import answers
+
+def test_exact_and_skeleton_matches():
+    expected = answers.AnswerKey("كَتَبْتُ")
+    assert answers.check(expected, "كَتَبْتُ") == (answers.EXACT, None)
+    assert answers.check(expected, "كتبت") == (answers.SKELETON, 0)
+    assert answers.check(expected, "كَتَبتُ") == (answers.SKELETON, 2)
+
+def test_typing_and_wrong():
+    expected = answers.AnswerKey("كَتَبْتُ")
+    assert answers.check(expected, "") == (answers.EMPTY, None)
+    assert answers.check(expected, "كت") == (answers.TYPING, None)
+    assert answers.check(expected, "كتم") == (answers.WRONG, 2)
+    assert answers.check(expected, "كتبتم") == (answers.WRONG, 4)
+
+def test_folded_characters_do_not_break_the_comparison():
+    # "-" is folded out of the skeleton, so it must not shift the letters either
+    expected = answers.AnswerKey("كَتَبْتُ")
+    assert answers.check(expected, "كَتَبْتُ-") == (answers.EXACT, None)
+    assert answers.check(expected, "-كَتَبْتُ") == (answers.EXACT, None)
+    assert answers.check(expected, "كَتَ-بْتُ") == (answers.EXACT, None)
+    assert answers.check(expected, "كتبت-") == (answers.SKELETON, 0)
+
+def test_hamza_variants_match_on_the_skeleton():
+    expected = answers.AnswerKey("أَكَلَ")
+    assert answers.check(expected, "اكل")[0] == answers.SKELETON
+
+SIMILAR = ["كَتَبَ", "كَسَبَ", "كَذَبَ", "دَرَسَ", "جَلَسَ", "شَرِبَ", "ذَهَبَ"]
+
+def test_neighbors_differ_by_one_letter_first():
+    index = answers.DistractorIndex().build(SIMILAR)
+    assert sorted(index.neighbors(0, 2)) == [1, 2]
+    found = index.neighbors(0, 5)
+    assert 0 not in found and len(found) == len(set(found)) == 5
+    assert set(found[:2]) == {1, 2}
+    # شَرِبَ is one letter away from nothing and has other vowels
+    assert 5 not in index.neighbors(3, 6)
@@ -0,0 +1,81 @@
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import pytest
+
+import arabpython_v5 as app
+import audio
+import scheduler
+import sessionlog
+from benchmark import write_clips
+
+def clip_cache(tmp_path, clips=3, max_bytes=audio.CACHE_BYTES):
+    write_clips(str(tmp_path), clips)
+    return audio.SoundCache(str(tmp_path), max_bytes)
+
+def test_least_recently_used_clips_go_past_the_byte_budget(tmp_path):
+    cache = clip_cache(tmp_path)
+    clip_bytes = cache.sound_bytes(cache.load("clip0.wav"))
+    cache.max_bytes = 2 * clip_bytes
+    cache.load("clip1.wav")
+    cache.load("clip0.wav")  # Now the most recently used
+    cache.load("clip2.wav")
+    assert list(cache.entries) == ["clip0.wav", "clip2.wav"]
+    assert cache.total_bytes == 2 * clip_bytes
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 1)
+
+def test_a_missing_clip_is_reported_once(tmp_path, capsys):
+    cache = clip_cache(tmp_path)
+    assert cache.load("missing.wav") is None
+    assert cache.load("missing.wav") is None
+    assert capsys.readouterr().out.count("Could not load audio") == 1
+    assert cache.misses == 1
+    cache.prefetch(["missing.wav"])
+    assert cache.thread is None  # Nothing worth decoding
+
+def test_prefetched_clips_are_found_decoded(tmp_path):
+    cache = clip_cache(tmp_path)
+    cache.prefetch(["clip0.wav", "clip1.wav", "clip0.wav"])
+    deadline = time.monotonic() + 5
+    while cache.prefetched < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    cache.close()
+    assert not cache.thread.is_alive()
+    assert cache.prefetched == 2
+    assert cache.load("clip0.wav") is not None and cache.load("clip1.wav") is not None
+    assert (cache.hits, cache.misses) == (2, 0)
+
+def test_a_missing_audio_device_is_tried_once(tmp_path, monkeypatch):
+    attempts = []
+    def fail():
+        attempts.append(1)
+        raise pygame.error("no audio device")
+    monkeypatch.setattr(pygame.mixer, "get_init", lambda: None)
+    monkeypatch.setattr(pygame.mixer, "init", fail)
+    cache = clip_cache(tmp_path)
+    assert cache.load("clip0.wav") is None
+    cache.prefetch(["clip1.wav"])
+    cache.play(["clip0.wav"])
+    assert len(attempts) == 1
+
+def test_quit_closes_the_workers_before_pygame(tmp_path, monkeypatch):
+    write_clips(str(tmp_path), 2)
+    journal = scheduler.ReviewJournal(str(tmp_path / "progress.jsonl"))
+    monkeypatch.setattr(app.context, "progress", scheduler.Scheduler(journal), raising=False)
+    monkeypatch.setattr(app.context, "session_log", sessionlog.SessionLog(":memory:"), raising=False)
+    monkeypatch.setattr(app.context, "sounds", audio.SoundCache(str(tmp_path)), raising=False)
+    app.context.progress.review("card", True)
+    app.context.session_log.log(sessionlog.SHOWN, "card")
+    app.context.sounds.prefetch(["clip0.wav", "clip1.wav"])
+    # Workers must be stopped by the time the mixer goes away
+    stopped = []
+    monkeypatch.setattr(pygame, "quit", lambda: stopped.append(
+        (app.context.sounds.thread.is_alive(), app.context.session_log.thread.is_alive(), journal.file)))
+    with pytest.raises(SystemExit):
+        app.shutdown()
+    assert stopped == [(False, False, None)]
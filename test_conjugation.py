@@ -0,0 +1,45 @@
+import pytest
+
+import conjugation
+
+KATABA = {"infinitive": "كَتَبَ", "meaning": "писать", "root": "ك-ت-ب", "pattern": "a-u"}
+
+def forms(table):
+    return {row["pronoun"]: row["conjugation"] for row in table}
+
+def test_regular_root_is_conjugated_from_its_pattern():
+    past = forms(conjugation.conjugate_verb(KATABA, "past"))
+    present = forms(conjugation.conjugate_verb(KATABA, "present"))
+    assert past["أنا"] == "كَتَبْتُ"
+    assert past["هم"] == "كَتَبُوا"
+    assert present["أنا"] == "أَكْتُبُ"
+    assert present["انتِ"] == "تَكْتُبِينَ"
+    assert len(past) == len(present) == len(conjugation.STANDARD_PRONOUNS)
+
+def test_exceptions_replace_generated_forms():
+    verb = dict(KATABA, exceptions={"present": {"هو": "يَكْتِبُ"}})
+    expanded = conjugation.expand_verb(verb)
+    assert "pattern" not in expanded and "exceptions" not in expanded
+    assert forms(expanded["present"])["هو"] == "يَكْتِبُ"
+    assert forms(expanded["present"])["هي"] == "تَكْتُبُ"
+
+def test_compact_and_expand_round_trip():
+    full = conjugation.expand_verb(dict(KATABA, exceptions={"past": {"هي": "كَتَبَتْ!"}}))
+    compact = conjugation.compact_verb(full)
+    assert compact["pattern"] == "a-u"
+    assert compact["exceptions"] == {"past": {"هي": "كَتَبَتْ!"}}
+    assert conjugation.expand_verb(compact) == full
+
+def test_weak_roots_keep_their_tables():
+    with pytest.raises(ValueError):
+        conjugation.split_root("ق-و-ل")
+    with pytest.raises(ValueError):
+        conjugation.split_root("م-د-د")
+    verb = {"infinitive": "قَالَ", "root": "ق-و-ل", "past": [], "present": []}
+    assert conjugation.compact_verb(verb) is verb
+
+def test_compact_error_names_what_the_rules_cannot_do():
+    assert conjugation.compact_error(KATABA) is None
+    assert "weak" in conjugation.compact_error(dict(KATABA, root="ق-و-ل"))
+    assert "pattern" in conjugation.compact_error(dict(KATABA, pattern="o-o"))
+    assert conjugation.compact_error({"infinitive": "?", "pattern": "a-u"}) is not None
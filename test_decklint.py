@@ -0,0 +1,111 @@
+import json
+
+import conjugation
+import decklint
+
+def table(form="كَتَبْتُ"):
+    return [{"pronoun": pronoun, "conjugation": form, "meaning": meaning}
+            for pronoun, meaning in conjugation.STANDARD_PRONOUNS]
+
+def verb(**fields):
+    entry = {"infinitive": "كَتَبَ", "meaning": "писать", "root": "ك-ت-ب", "past": table(), "present": table()}
+    entry.update(fields)
+    return entry
+
+def write_deck(tmp_path, verbs, name="deck.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps({"verbs": verbs}, ensure_ascii=False, indent=2), encoding="utf-8")
+    return str(path)
+
+def messages(problems):
+    return [(line, severity, message.split(": ", 1)[1]) for _, line, severity, message in problems]
+
+def test_clean_deck_has_no_problems(tmp_path):
+    problems, verbs = decklint.lint_decks([write_deck(tmp_path, [verb(), verb(infinitive="شَرِبَ", root="ش-ر-ب")])], jobs=1)
+    assert problems == []
+    assert verbs == 2
+
+def test_problems_point_at_the_verb_line(tmp_path):
+    rows = table()
+    rows[3]["conjugation"] = ""
+    path = write_deck(tmp_path, [verb(), verb(infinitive="قَالَ", root="ق-و-ل", past=rows), verb(root="ش-ر-ب")])
+    problems, _ = decklint.lint_decks([path], jobs=1)
+    lines = open(path, encoding="utf-8").read().splitlines()
+    assert [severity for _, _, severity, _ in problems] == [decklint.ERROR, decklint.ERROR]
+    # The reported line opens the verb's object; its first key follows
+    assert lines[problems[0][1] - 1].strip() == "{"
+    assert "قَالَ" in lines[problems[0][1]]
+    assert "past[3] (هو): empty conjugation" in problems[0][3]
+    assert "does not match the consonants" in problems[1][3]
+    assert problems[0][1] < problems[1][1]
+
+def test_malformed_rows_are_reported_not_raised(tmp_path):
+    rows = table()
+    rows[0]["pronoun"] = ["أنا"]
+    rows[1]["meaning"] = {"ru": "ты"}
+    rows[2] = "انتِ"
+    path = write_deck(tmp_path, [verb(past=rows, present={"هو": "يَكْتُبُ"}), verb(root=["ك", "ت", "ب"]), 5,
+                                 verb(pattern=["a-u"], exceptions={"past": {"هو": ""}})])
+    found = [message for _, _, message in messages(decklint.lint_decks([path], jobs=1)[0])]
+    assert "past[0]: unknown pronoun ['أنا']" in found
+    assert "past[1] (انتَ): meaning {'ru': 'ты'} is not a string" in found
+    assert "past[2] is not an object" in found
+    assert '"present" is not a list of pronoun rows' in found
+    assert '"root" is not a string' in found
+    assert "verb is not an object" in found
+    assert "exceptions.past (هو): empty conjugation" in found
+
+def test_invalid_json_is_reported_with_position(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('{"verbs": [\n  {"infinitive": }\n]}', encoding="utf-8")
+    empty = write_deck(tmp_path, [], "empty.json")
+    for jobs in (1, 4):
+        problems, verbs = decklint.lint_decks([str(path), empty], jobs=jobs)
+        assert verbs == 0
+        assert [(line, severity) for _, line, severity, _ in problems] == [(2, decklint.ERROR)]
+        assert "invalid JSON" in problems[0][3]
+
+def test_chunks_cut_inside_a_verb_are_cut_again(tmp_path, monkeypatch):
+    # Rows that open with the verb's first key look like the gap between verbs
+    monkeypatch.setattr(decklint, "CHUNK_SIZE", 2000)
+    rows = [{"meaning": row["meaning"], "pronoun": row["pronoun"], "conjugation": row["conjugation"]} for row in table()]
+    verbs = [{"meaning": "писать", "infinitive": f"كَتَبَ{i}", "root": "ش-ر-ب", "past": rows, "present": rows} for i in range(20)]
+    path = tmp_path / "rows.json"
+    path.write_text(json.dumps({"verbs": verbs, "name": "rows"}, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    text = path.read_text(encoding="utf-8")
+    exact = {start for start, _ in decklint.verb_spans(text)}
+    assert not exact.issuperset(decklint.guessed_starts(text, decklint.CHUNK_SIZE))
+    for jobs in (1, 2):
+        problems, count = decklint.lint_decks([str(path)], jobs=jobs)
+        assert count == 20
+        assert len(problems) == 20 and all("does not match the consonants" in message for _, _, message in messages(problems))
+
+def test_invalid_json_in_a_later_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(decklint, "CHUNK_SIZE", 2000)
+    path = write_deck(tmp_path, [verb(infinitive=f"كَتَبَ{i}") for i in range(10)])
+    text = open(path, encoding="utf-8").read()
+    broken = text.rindex('"root"')
+    open(path, "w", encoding="utf-8").write(text[:broken] + '"root": ,' + text[broken:])
+    for jobs in (1, 2):
+        problems, verbs = decklint.lint_decks([path], jobs=jobs)
+        assert verbs == 0
+        assert [(line, severity) for _, line, severity, _ in problems] == [(text.count("\n", 0, broken) + 1, decklint.ERROR)]
+
+def test_duplicates_and_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(decklint, "CHUNK_SIZE", 20000)
+    verbs = [verb(infinitive=f"كَتَبَ{i}") for i in range(30)] + [verb(infinitive="كَتَبَ5")]
+    path = write_deck(tmp_path, verbs)
+    assert len(decklint.guessed_starts(open(path, encoding="utf-8").read(), decklint.CHUNK_SIZE)) > 2
+    serial = decklint.lint_decks([path], jobs=1)
+    pooled = decklint.lint_decks([path], jobs=2)
+    assert serial == pooled
+    problems, count = pooled
+    assert count == len(verbs)
+    assert len(problems) == 1 and problems[0][2] == decklint.WARNING and "duplicate" in problems[0][3]
+
+def test_roots_of_weak_and_doubled_verbs_match():
+    assert decklint.lint_root("ق-و-ل", "قَالَ") == []
+    assert decklint.lint_root("س-ء-ل", "سَأَلَ") == []
+    assert decklint.lint_root("م-د-د", "مَدَّ") == []
+    assert decklint.lint_root("خ-د-م", "اِسْتَخْدَمَ") == []
+    assert decklint.lint_root("ك-ت", "كَتَبَ")[0][0] == decklint.ERROR
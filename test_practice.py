@@ -0,0 +1,75 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import arabpython_v5 as app
+import scheduler
+import sessionlog
+from benchmark import SyntheticDeck, click, replay, use_deck
+
+MODE_POS = (app.WIDTH - 100, 40)
+OPTION_POS = (app.WIDTH // 2 - 150, 418)
+ACTION_POS = (app.WIDTH // 2, app.HEIGHT - 50)
+IDLE = ([], (100, 100))
+
+def test_peeked_card_is_served_next():
+    progress = scheduler.Scheduler()
+    session = scheduler.PracticeSession(progress, [], iter([("a", 1), ("b", 2), ("c", 3)]))
+    current = session.next(now=0)
+    peeked = session.next(now=0, skip=current[0])
+    session.review(current[0], False, now=0)  # Missed: due again in RETRY_INTERVAL
+    assert session.next(now=1) == peeked
+
+class ShownLog(sessionlog.SessionLog):
+    # Session log that also remembers which cards were put on screen
+    def __init__(self):
+        super().__init__(":memory:")
+        self.shown = []
+        
+    def log(self, kind, card, *args, **kwargs):
+        if kind == sessionlog.SHOWN:
+            self.shown.append(card)
+        super().log(kind, card, *args, **kwargs)
+
+def practice_replay(monkeypatch, frames):
+    # Cards shown, and (frame, card) of every choice_options call
+    app.context.screen
+    use_deck(SyntheticDeck(20))
+    shown_log = ShownLog()
+    monkeypatch.setattr(app.context, "session_log", shown_log)
+    verb_table = app.context.verb_table
+    calls = []
+    real_choice_options = app.choice_options
+    
+    def recording_choice_options(verb_table, verb_index, tense_index, pronoun_index, count=4):
+        verb = verb_table.verb(verb_index)
+        card = f"{verb.infinitive}|{verb.root or ''}|{app.TENSES[tense_index]}|{verb_table.pronouns[pronoun_index][0]}"
+        calls.append((app.context.input.next_frame, card))
+        return real_choice_options(verb_table, verb_index, tense_index, pronoun_index, count)
+    
+    monkeypatch.setattr(app, "choice_options", recording_choice_options)
+    try:
+        replay(lambda: app.practice_screen("past", -1), frames)
+    finally:
+        shown_log.close()
+    return shown_log.shown, calls
+
+def test_prefetched_question_and_options_are_used_for_the_next_card(monkeypatch):
+    frames = [(click(MODE_POS), MODE_POS)] + [IDLE] * 3
+    frames += [(click(OPTION_POS), OPTION_POS), (click(ACTION_POS), ACTION_POS)]
+    shown, calls = practice_replay(monkeypatch, frames)
+    assert len(shown) == 2
+    prefetch_calls = [card for frame, card in calls if 1 < frame <= 4]
+    assert prefetch_calls == [shown[1]]
+    assert all(frame < len(frames) for frame, _ in calls)  # Nothing left to build on "next"
+
+def test_mode_toggle_discards_the_prefetched_question(monkeypatch):
+    # Peeked in typed mode, without options; after switching to choices the
+    # next question must be peeked again, with its options
+    frames = [IDLE] * 3 + [(click(MODE_POS), MODE_POS)] + [IDLE] * 3
+    frames += [(click(OPTION_POS), OPTION_POS), (click(ACTION_POS), ACTION_POS)]
+    shown, calls = practice_replay(monkeypatch, frames)
+    assert len(shown) == 2
+    assert [card for frame, card in calls if frame > 4] == [shown[1]]
+    assert all(frame < len(frames) for frame, _ in calls)
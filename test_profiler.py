@@ -0,0 +1,35 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import arabpython_v5 as app
+
+def press_f4():
+    updater = app.ScreenUpdater(pygame.Surface((app.WIDTH, app.HEIGHT)), "test")
+    updater.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_F4))
+
+def test_f4_saves_recent_frames(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app, "profiler", app.Profiler())
+    app.profiler.start_frame("test", 0)
+    app.profiler.end_frame()
+    press_f4()
+    traces = list(tmp_path.glob("arabpython-trace-*.csv"))
+    assert len(traces) == 1
+    assert traces[0].read_text(encoding="utf-8").startswith(",".join(app.TRACE_FIELDS))
+    assert app.profiler.status.startswith("saved ")
+
+def test_f4_reports_an_unwritable_directory_on_the_overlay(tmp_path, monkeypatch, capsys):
+    # The working directory is gone, so the trace cannot be created even as root
+    work = tmp_path / "install"
+    work.mkdir()
+    monkeypatch.chdir(work)
+    work.rmdir()
+    monkeypatch.setattr(app, "profiler", app.Profiler())
+    press_f4()
+    assert app.profiler.overlay_visible
+    assert app.profiler.status.startswith("not saved")
+    assert "Could not save trace" in capsys.readouterr().out
@@ -0,0 +1,26 @@
+import os
+
+import report
+import sessionlog
+
+def write_log(path):
+    log = sessionlog.SessionLog(str(path))
+    log.log(sessionlog.SHOWN, "card")
+    log.log(sessionlog.ANSWER, "card", correct=False, answer="x", elapsed=1.5)
+    log.close()
+    return str(path)
+
+def test_logs_are_read(tmp_path):
+    totals = report.Totals()
+    totals.add_log(write_log(tmp_path / "alice #1?.sqlite3"))
+    assert totals.logs == 1
+    assert totals.events == 2
+    assert totals.counts["errors"].tolist() == [1]
+
+def test_a_missing_log_is_reported_and_not_created(tmp_path, capsys):
+    path = str(tmp_path / "alcie.sqlite3")
+    totals = report.Totals()
+    totals.add_log(path)
+    assert totals.logs == 0
+    assert not os.path.exists(path)
+    assert "Skipping" in capsys.readouterr().out
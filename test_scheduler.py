@@ -0,0 +1,58 @@
+import random
+
+import scheduler
+
+def test_lazy_shuffle_visits_every_index_once():
+    for size in (0, 1, 2, 3, 17, 1000):
+        order = list(scheduler.LazyShuffle(size, random.Random(size)))
+        assert sorted(order) == list(range(size))
+
+def test_intervals_grow_and_reset():
+    card = scheduler.Card("k")
+    card.review(True, 0)
+    assert card.due == scheduler.FIRST_INTERVAL
+    card.review(True, 0)
+    assert card.interval == scheduler.SECOND_INTERVAL
+    card.review(True, 0)
+    assert card.interval > scheduler.SECOND_INTERVAL
+    card.review(False, 100)
+    assert (card.reps, card.lapses, card.due) == (0, 1, 100 + scheduler.RETRY_INTERVAL)
+
+def test_due_cards_come_before_new_ones():
+    progress = scheduler.Scheduler()
+    progress.review("old", False, now=0)
+    session = scheduler.PracticeSession(progress, [("old", 1)], iter([("new", 2), ("old", 1)]))
+    assert session.next(now=0) == ("new", 2)  # "old" is not due yet
+    assert session.next(now=scheduler.RETRY_INTERVAL) == ("old", 1)
+    assert session.next(now=0, skip="new") == ("old", 1)  # Nothing else new: the soonest due card
+
+def test_unreviewed_new_card_is_asked_again():
+    session = scheduler.PracticeSession(scheduler.Scheduler(), [], iter([("a", 1), ("b", 2)]))
+    assert session.next(now=0) == ("a", 1)
+    assert session.next(now=0, skip="a") == ("b", 2)
+    assert session.next(now=0) == ("a", 1)
+    session.drop("a")
+    assert session.next(now=0) == ("b", 2)
+
+def test_journal_keeps_progress_between_sessions(tmp_path):
+    path = str(tmp_path / "progress" / "journal.jsonl")
+    progress = scheduler.Scheduler(scheduler.ReviewJournal(path))
+    progress.review("k", True, now=10)
+    progress.review("k", True, now=20)
+    progress.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"k": "cut sh')  # A line a crash cut short
+    card = scheduler.Scheduler(scheduler.ReviewJournal(path)).cards["k"]
+    assert (card.reps, card.due) == (2, 20 + scheduler.SECOND_INTERVAL)
+
+def test_journal_is_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, "COMPACT_MIN_LINES", 5)
+    path = str(tmp_path / "journal.jsonl")
+    journal = scheduler.ReviewJournal(path)
+    progress = scheduler.Scheduler(journal)
+    for i in range(20):
+        progress.review("k", True, now=i)
+    progress.close()
+    with open(path, encoding='utf-8') as f:
+        assert len(f.readlines()) < 20
+    assert scheduler.Scheduler(scheduler.ReviewJournal(path)).cards["k"].reps == 20
@@ -0,0 +1,36 @@
+import search
+
+FIELDS = [
+    ("كَتَبَ", "ك-ت-ب", "писать"),
+    ("قَرَأَ", "ق-ر-أ", "читать"),
+    ("كَتَّبَ", None, "заставить писать"),
+    ("سَأَلَ", "س-أ-ل", "спрашивать"),
+]
+
+def test_normalize_folds_marks_hamza_and_case():
+    assert search.normalize("كَتَبَ") == search.normalize("ك-ت-ب") == "كتب"
+    assert search.normalize("قَرَأَ") == "قرا"
+    assert search.normalize("  Ёлка  ") == "елка"
+    assert search.normalize("-") == ""
+
+def test_short_and_long_queries():
+    index = search.SearchIndex().build(FIELDS)
+    assert list(index.search("كتب")) == [0, 2]
+    assert list(index.search("ك-ت-ب")) == [0, 2]
+    assert list(index.search("قرأ")) == [1]
+    assert list(index.search("писать")) == [0, 2]
+    assert list(index.search("заставить")) == [2]
+    assert list(index.search("писатьx")) == []
+    assert index.search("") is None and index.search("َ") is None
+
+def test_typing_narrows_the_previous_matches():
+    index = search.SearchIndex(cache_size=2).build(FIELDS)
+    results = [list(index.search("спрашивать"[:length])) for length in range(1, 11)]
+    assert results[-1] == [3]
+    assert list(index.search("спр")) == [3]  # Backspace back to a cached query
+    assert len(index.cache) == 2
+
+def test_fields_do_not_match_across_each_other():
+    index = search.SearchIndex().build(FIELDS)
+    # Matches only if the meaning and the infinitive ran together
+    assert list(index.search("тьك")) == []
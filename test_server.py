@@ -0,0 +1,111 @@
+import os
+import json
+import asyncio
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pytest
+
+import arabpython_v5 as app
+import server
+from benchmark import SyntheticDeck, use_deck
+
+def quiz_server(verb_count=20):
+    use_deck(SyntheticDeck(verb_count))
+    return server.QuizServer(app.context.verb_table)
+
+def expected_form(quiz, question):
+    verb_table = quiz.verb_table
+    session = quiz.sessions[question["session"]]
+    return verb_table.conjugation(session.verb_index, session.tense_index, session.pronoun_index)
+
+def test_http_session_flow():
+    quiz = quiz_server()
+    question = quiz.route("POST", "/session", {"tense": "present", "mode": "typed"})
+    assert question["type"] == "question" and question["tense"] == "present"
+    assert quiz.route("GET", "/session/" + question["session"], {})["card"] == question["card"]
+    result = quiz.route("POST", f"/session/{question['session']}/answer", {"answer": expected_form(quiz, question)})
+    assert result["correct"] and result["status"] == app.answers.EXACT
+    assert result["question"]["card"] != question["card"]
+    assert quiz.stats()["sessions"] == 1
+
+def test_choice_options_include_the_answer():
+    quiz = quiz_server()
+    question = quiz.route("POST", "/session", {"mode": "choice", "verb": 3})
+    assert expected_form(quiz, question) in question["options"]
+    result = quiz.route("POST", f"/session/{question['session']}/answer", {"answer": "?"})
+    assert result["correct"] is False and result["status"] is None
+
+@pytest.mark.parametrize("method, path, body, status", [
+    ("POST", "/session", {"tense": "future"}, 400),
+    ("POST", "/session", {"verb": 20}, 400),
+    ("POST", "/session", {"verb": True}, 400),
+    ("POST", "/session", {"mode": "oral"}, 400),
+    ("GET", "/session", {}, 405),
+    ("GET", "/session/nope", {}, 404),
+    ("GET", "/elsewhere", {}, 404),
+])
+def test_bad_requests(method, path, body, status):
+    with pytest.raises(server.RequestError) as error:
+        quiz_server().route(method, path, body)
+    assert error.value.status == status
+
+def test_frames_round_trip():
+    async def read_back(data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await server.read_frame(reader)
+    for size in (0, 5, 125, 126, 70000 % server.MAX_BODY, server.MAX_BODY):
+        payload = bytes(range(256)) * (size // 256) + bytes(size % 256)
+        for mask in (None, b"\x01\x02\x03\x04"):
+            frame = server.encode_frame(server.OP_TEXT, payload, mask)
+            assert asyncio.run(read_back(frame)) == (server.OP_TEXT, payload)
+    # A fragmented message with a ping in between
+    first = server.encode_frame(server.OP_TEXT, b"ab")
+    first = bytes([first[0] & 0x7F]) + first[1:]
+    ping = server.encode_frame(server.OP_PING, b"")
+    rest = server.encode_frame(server.OP_CONTINUATION, b"cd")
+    async def read_two(data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        fragments = []
+        return await server.read_frame(reader, fragments), await server.read_frame(reader, fragments)
+    assert asyncio.run(read_two(first + ping + rest)) == ((server.OP_PING, b""), (server.OP_TEXT, b"abcd"))
+
+def test_http_and_websocket_over_a_socket():
+    quiz = quiz_server()
+    
+    async def exchange():
+        listener = await asyncio.start_server(quiz.handle_connection, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps({"mode": "recall"}).encode()
+        writer.write(b"POST /session HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+        started = json.loads(await reader.readexactly(length))
+        
+        writer.write(b"GET /ws HTTP/1.1\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n\r\n")
+        handshake = await reader.readuntil(b"\r\n\r\n")
+        writer.write(server.encode_frame(server.OP_TEXT, json.dumps({"type": "start"}).encode(), b"abcd"))
+        _, question = await server.read_frame(reader)
+        writer.write(server.encode_frame(server.OP_TEXT, json.dumps({"type": "answer", "known": True}).encode(), b"abcd"))
+        _, result = await server.read_frame(reader)
+        writer.write(server.encode_frame(server.OP_CLOSE, b"\x03\xe8", b"abcd"))
+        closed = await server.read_frame(reader)
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return started, handshake, json.loads(question), json.loads(result), closed
+    
+    started, handshake, question, result, closed = asyncio.run(exchange())
+    assert started["type"] == "question" and "session" in started
+    assert b"101 Switching Protocols" in handshake
+    assert b"Sec-WebSocket-Accept: s3pPLMBiTxaQ9kYGzzhZRbK+xOo=" in handshake
+    assert question["type"] == "question"
+    assert result["type"] == "result" and result["correct"] is True
+    assert closed == (server.OP_CLOSE, b"\x03\xe8")
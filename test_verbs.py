@@ -0,0 +1,206 @@
+import os
+import json
+import queue
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import arabpython_v5 as app
+from benchmark import ReplayFinished, ReplayInput, SyntheticDeck, text_input, use_deck
+
+def test_answer_keys_are_split_on_demand():
+    table = app.VerbTable(SyntheticDeck(1000))
+    table.load_all()
+    assert not table.answer_keys
+    key = table.answer_key(3, 0, 0)
+    assert key.skeleton == app.search.normalize(table.conjugation(3, 0, 0))
+    assert table.answer_key(3, 0, 0) is key
+    for verb_index in range(len(table)):
+        table.answer_key(verb_index, 1, 2)
+    assert len(table.answer_keys) == app.ANSWER_KEY_CACHE
+
+def deck_with_pronouns(counts):
+    # Verb i has the first counts[i] synthetic pronouns, in both tenses
+    deck = SyntheticDeck(len(counts))
+    verbs = []
+    for i, count in enumerate(counts):
+        verb = deck[i]
+        for tense in app.TENSES:
+            verb[tense] = verb[tense][:count]
+        verbs.append(verb)
+    return verbs
+
+def asked_cards(session, limit=10000):
+    # Keys of every card the session asks before it starts repeating
+    asked = []
+    while len(asked) < limit:
+        card = session.next()
+        if card is None or card[0] in asked:
+            break
+        asked.append(card[0])
+        session.review(card[0], True)
+    return asked
+
+def choice_table(monkeypatch, ready=True):
+    # Compact entries whose infinitives are one or two letters apart
+    roots = ["ك-ت-ب", "ك-س-ب", "ك-ذ-ب", "د-ر-س", "ج-ل-س", "ذ-ه-ب"]
+    verbs = [{"infinitive": app.conjugation.conjugate(root, "a-i", "past")[3][1], "root": root, "pattern": "a-i"}
+             for root in roots]
+    table = app.VerbTable(verbs)
+    index = app.answers.DistractorIndex()
+    if ready:
+        index.build(verb["infinitive"] for verb in verbs)
+    monkeypatch.setattr(app.context, "distractor_index", index, raising=False)
+    return table
+
+def test_choice_options_are_four_distinct_skeletons_with_the_answer(monkeypatch):
+    table = choice_table(monkeypatch)
+    own_forms = {table.conjugation(0, 0, pronoun_index) for pronoun_index in table.pronoun_indices(0, 0)}
+    from_similar_verbs = 0
+    for verb_index in range(len(table)):
+        for pronoun_index in table.pronoun_indices(verb_index, 0):
+            options = app.choice_options(table, verb_index, 0, pronoun_index)
+            assert len(options) == 4
+            assert table.conjugation(verb_index, 0, pronoun_index) in options
+            assert len({table.form_key(option).skeleton for option in options}) == 4
+            if verb_index == 0:
+                from_similar_verbs += len(set(options) - own_forms)
+    assert from_similar_verbs > 0
+
+def test_choice_options_use_the_same_verb_until_the_index_is_ready(monkeypatch):
+    table = choice_table(monkeypatch, ready=False)
+    own_forms = {table.conjugation(0, 0, pronoun_index) for pronoun_index in table.pronoun_indices(0, 0)}
+    for pronoun_index in table.pronoun_indices(0, 0):
+        options = app.choice_options(table, 0, 0, pronoun_index)
+        assert table.conjugation(0, 0, pronoun_index) in options
+        assert set(options) <= own_forms
+        assert len({table.form_key(option).skeleton for option in options}) == len(options) > 1
+
+def test_hard_mode_asks_pronouns_the_first_verb_lacks():
+    table = app.VerbTable(deck_with_pronouns([2] + [10] * 19))
+    session = app.practice_session(table, 0, range(len(table)), app.scheduler.Scheduler())
+    asked = asked_cards(session)
+    assert len(asked) == 2 + 10 * 19
+    assert len(set(asked)) == len(asked)
+
+def test_compact_entries_the_rules_cannot_conjugate_have_no_cards(capsys):
+    table = app.VerbTable([
+        {"infinitive": "كَتَبَ", "root": "ك-ت-ب", "pattern": "a-u"},
+        {"infinitive": "قَالَ", "root": "ق-و-ل", "pattern": "a-u"},
+        {"infinitive": "دَرَسَ", "root": "د-ر-س", "pattern": "o-o"},
+    ])
+    assert table.conjugation(0, 0, 0) == "كَتَبْتُ"
+    assert table.conjugation(1, 0, 0) is None
+    assert table.conjugation(2, 1, 0) is None
+    output = capsys.readouterr().out
+    assert "قَالَ" in output and "دَرَسَ" in output
+    session = app.practice_session(table, 0, [1, 2], app.scheduler.Scheduler())
+    assert asked_cards(session) == []
+
+def write_deck(path, verbs):
+    path.write_text(json.dumps({"verbs": verbs}, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+def test_single_deck_duplicates_are_dropped_at_startup_and_on_reload(tmp_path):
+    verbs = SyntheticDeck(3)[:]
+    deck = write_deck(tmp_path / "verbs.json", verbs + [dict(verbs[1], meaning="copy")])
+    merged = app.load_decks([deck], json_path=deck, compiled_path=str(tmp_path / "verbs.bin"))
+    assert [verb["infinitive"] for verb in merged] == [verb["infinitive"] for verb in verbs]
+    
+    pygame.display.init()  # poll() posts DECKS_CHANGED
+    watcher = app.DeckWatcher(merged, [deck], decks_dir=None, json_path=deck)
+    watcher.scan_initial()
+    write_deck(tmp_path / "verbs.json", verbs + [dict(verbs[1], meaning="copy"), dict(verbs[0], infinitive="new")])
+    watcher.poll()
+    change = watcher.changes.get_nowait()
+    assert not change.removed and not change.changed
+    assert list(change.added) == [3]
+
+def test_reload_keeps_indices_and_lets_a_later_deck_take_over(tmp_path):
+    verbs = SyntheticDeck(6)[:]
+    first = write_deck(tmp_path / "verbs.json", verbs[:3])
+    (tmp_path / "decks").mkdir()
+    second = write_deck(tmp_path / "decks" / "b.json", verbs[3:] + [dict(verbs[1], meaning="from b")])
+    merged = app.load_decks([first, second], json_path=first, compiled_path=str(tmp_path / "verbs.bin"),
+                            cache_dir=str(tmp_path / "cache"))
+    table = app.VerbTable(merged)
+    assert len(merged) == 6
+    old_form = table.conjugation(0, 0, 0)
+    
+    pygame.display.init()
+    watcher = app.DeckWatcher(merged, [first, second], decks_dir=str(tmp_path / "decks"), json_path=first)
+    watcher.scan_initial()
+    edited = dict(verbs[0], past=[dict(row, conjugation=row["conjugation"] + "!") for row in verbs[0]["past"]])
+    write_deck(tmp_path / "verbs.json", [edited, dict(verbs[0], infinitive="new")])
+    watcher.poll()
+    change = watcher.changes.get_nowait()
+    assert change.changed == {0, 1}
+    assert change.removed == {2}
+    assert list(change.added) == [6]
+    
+    merged.apply(change)
+    table.apply(change)
+    assert len(merged) == len(table) == 7
+    assert merged[1]["meaning"] == "from b"
+    assert table.conjugation(0, 0, 0) == old_form + "!"
+    assert table.verb(6).infinitive == "new"
+    assert 2 not in table.shown_indices()
+
+def test_decks_load_without_a_usable_cache_dir(tmp_path, capsys):
+    deck = write_deck(tmp_path / "extra.json", SyntheticDeck(2)[:])
+    (tmp_path / "cache").write_text("not a directory")
+    merged = app.load_decks([deck], json_path=str(tmp_path / "verbs.json"), cache_dir=str(tmp_path / "cache" / "decks"))
+    assert len(merged) == 2
+    assert "Could not create" in capsys.readouterr().out
+
+class ReloadingReplay(ReplayInput):
+    # Replay that hands the app a deck change when the given frame is reached
+    def __init__(self, frames, change_frame, change):
+        super().__init__(frames)
+        self.change_frame = change_frame
+        self.change = change
+        
+    def deliver(self):
+        if self.next_frame == self.change_frame:
+            app.context.deck_watcher.changes.put(self.change)
+        return super().deliver()
+
+class StubWatcher:
+    def __init__(self):
+        self.changes = queue.Queue()
+
+def replay_with_reload(run, frames, change_frame, change):
+    app.context.deck_watcher = StubWatcher()
+    replay_input = ReloadingReplay(frames, change_frame, change)
+    app.context.input = replay_input
+    try:
+        run()
+    except ReplayFinished:
+        pass
+    finally:
+        app.context.input = app.PygameInput()
+        app.context.deck_watcher = None
+    return replay_input
+
+def test_reload_with_a_query_that_normalizes_to_nothing():
+    app.context.screen
+    verbs = list(SyntheticDeck(30))
+    use_deck(app.MergedVerbDB([verbs]))
+    pos = (100, 100)
+    for query in ("-", " ", "َ", "كتب1"):
+        frames = [([text_input(letter)], pos) for letter in query] + [([], pos)] * 6
+        verbs[2] = dict(verbs[2], meaning="читать")
+        change = app.DeckChange(len(verbs))
+        change.changed = {2}
+        replay = replay_with_reload(lambda: app.verb_selection_screen("past"), frames, len(query) + 2, change)
+        assert replay.next_frame == len(frames)
+        assert app.context.verb_table.verb(2).meaning == "читать"
+
+def test_a_new_deck_closes_the_previous_session_log():
+    use_deck(SyntheticDeck(5))
+    first = app.context.session_log
+    use_deck(SyntheticDeck(5))
+    assert not first.thread.is_alive()
+    assert app.context.session_log.thread.is_alive()